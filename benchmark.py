@@ -0,0 +1,256 @@
+import bpy
+import bmesh
+import os
+import sys
+import json
+import time
+import argparse
+import importlib.util
+from math import radians
+from random import seed, randint
+from mathutils import Vector
+
+# blender runs this script without its directory on the path, so main.py is loaded from its file
+main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+main_spec = importlib.util.spec_from_file_location("main", main_path)
+main = importlib.util.module_from_spec(main_spec)
+main_spec.loader.exec_module(main)
+
+# distance between two columns and between two levels of the generated towers
+column_spacing = 4
+level_height = 5
+member_radius = 0.1
+
+
+def parse_args(args):
+    """
+    parses the arguments after '--'
+
+    :param args: a list of arguments
+    :return: the parsed arguments
+    """
+
+    parser = argparse.ArgumentParser(prog="blender -b --factory-startup --python benchmark.py --",
+                                     description="time the stages of the demolition optimisation on generated towers")
+    parser.add_argument("--sizes", default="2x5,2x10,3x20,4x40",
+                        help="comma separated list of <columns>x<levels>, a tower has columns x columns legs")
+    parser.add_argument("--frames", type=int, default=20, help="number of frames that are baked")
+    parser.add_argument("--samples", type=int, default=20, help="number of hinges the per hinge stages are timed on")
+    parser.add_argument("--skip-quadratic", type=int, default=5000,
+                        help="skip find_closest_object on towers with more hinges than this")
+    parser.add_argument("--output", default="benchmark_results.json", help="json file the results are written to")
+    parser.add_argument("--baseline", help="json file of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=1.2,
+                        help="a stage that is this many times slower than the baseline is a regression")
+    return parser.parse_args(args)
+
+
+def clear_scene():
+    """
+    removes all objects and the rigid body world, and resets the global state of main.py
+    """
+
+    if bpy.context.scene.rigidbody_world is not None:
+        bpy.ops.rigidbody.world_remove()
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
+
+    main.hinge_set.clear()
+    main.hinge_set_idx.clear()
+    main.hinge_pairs.clear()
+    main.removed_hinges.clear()
+    main.member_idxs = None
+    main.physics_added = False
+    main.armed_physics_params = None
+    main.pristine_physics_state = None
+    main.pristine_scene_snapshot = None
+    main.connectivity_graph = None
+    main.fitted_shapes.clear()
+
+
+def add_object(name, mesh, location, rotation=(0, 0, 0), scale=(1, 1, 1), parent=None):
+    """
+    adds an object to the scene
+
+    :return: the new object
+    """
+
+    obj = bpy.data.objects.new(name, mesh)
+    obj.location = location
+    obj.rotation_euler = rotation
+    obj.scale = scale
+    bpy.context.scene.collection.objects.link(obj)
+    if parent is not None:
+        obj.parent = parent
+        obj.matrix_parent_inverse = parent.matrix_world.inverted()
+    return obj
+
+
+def generate_tower(columns, levels):
+    """
+    generates a lattice tower of columns x columns legs and levels levels, following the naming of the radio tower
+    model: 'metal' members, a 'dish' on top, 'hinge' objects parented to the members they hold and the 'ground.000'
+    plane. Like in the model, a member is a cylinder along its local z axis with its half length as z scale, so
+    find_position_sides() finds its end points.
+
+    :param columns: number of legs along each side of the tower
+    :param levels: number of levels of the tower
+    """
+
+    cylinder = bpy.data.meshes.new("member")
+    bm = bmesh.new()
+    bmesh.ops.create_cone(bm, cap_ends=True, segments=8, radius1=member_radius, radius2=member_radius, depth=2)
+    bm.to_mesh(cylinder)
+    bm.free()
+
+    plane = bpy.data.meshes.new("ground")
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=1, y_segments=1, size=columns * column_spacing * 10)
+    bm.to_mesh(plane)
+    bm.free()
+    add_object("ground.000", plane, (0, 0, 0))
+
+    offset = (columns - 1) * column_spacing / 2
+    hinges = []
+    legs = {}
+    for level in range(0, levels):
+        z = level * level_height
+        for x in range(0, columns):
+            for y in range(0, columns):
+                position = Vector((x * column_spacing - offset, y * column_spacing - offset, z + level_height / 2))
+                legs[x, y, level] = add_object("metal.leg", cylinder, position, scale=(1, 1, level_height / 2))
+                if level > 0:
+                    hinges.append((legs[x, y, level - 1], position - Vector((0, 0, level_height / 2))))
+
+        # braces at the top of the level between neighbouring legs, rotated around a single axis
+        for x in range(0, columns):
+            for y in range(0, columns):
+                top = Vector((x * column_spacing - offset, y * column_spacing - offset, z + level_height))
+                if x + 1 < columns:
+                    brace = add_object("metal.brace", cylinder, top + Vector((column_spacing / 2, 0, 0)),
+                                       rotation=(0, radians(90), 0), scale=(1, 1, column_spacing / 2))
+                    hinges.append((brace, top))
+                    hinges.append((brace, top + Vector((column_spacing, 0, 0))))
+                if y + 1 < columns:
+                    brace = add_object("metal.brace", cylinder, top + Vector((0, column_spacing / 2, 0)),
+                                       rotation=(radians(90), 0, 0), scale=(1, 1, column_spacing / 2))
+                    hinges.append((brace, top))
+                    hinges.append((brace, top + Vector((0, column_spacing, 0))))
+
+    add_object("dish.000", cylinder, (0, 0, levels * level_height + 1), scale=(5, 5, 0.5))
+
+    bpy.context.view_layer.update()
+    for parent, position in hinges:
+        add_object("hinge", None, position, parent=parent)
+    bpy.context.view_layer.update()
+
+
+def timed(stages, name, function, *args, repeat=1):
+    """
+    runs a function and stores its average wall time in stages
+
+    :param stages: dictionary the time is stored in
+    :param name: name of the stage
+    :param function: the function to time
+    :param repeat: number of times the function is executed
+    :return: the result of the last call
+    """
+
+    start_time = time.perf_counter()
+    for idx in range(0, repeat):
+        result = function(*args)
+    stages[name] = (time.perf_counter() - start_time) / repeat
+    print(f"{name}: {stages[name]:.6f}s")
+    return result
+
+
+def benchmark_tower(columns, levels, args):
+    """
+    generates a tower and times every stage of the optimisation on it
+
+    :return: a dictionary with the size of the tower and the time of every stage
+    """
+
+    clear_scene()
+    generate_tower(columns, levels)
+    scene = bpy.context.scene
+    mytool = scene.my_tool
+    scene.frame_set(frame=0)
+
+    stages = {}
+    timed(stages, "init_hinge_set", main.init_hinge_set)
+    hinge_count = len(main.hinge_set)
+    samples = [randint(0, hinge_count - 1) for idx in range(0, args.samples)]
+    print(f"tower {columns}x{levels}: {len(main.get_member_objects())} members, {hinge_count} hinges")
+
+    timed(stages, "get_closest_hinges", lambda: [main.get_closest_hinges(idx) for idx in samples])
+    stages["get_closest_hinges"] /= len(samples)
+    if hinge_count <= args.skip_quadratic:
+        timed(stages, "find_closest_object",
+              lambda: [main.find_closest_object(scene.objects[main.hinge_set[idx]]) for idx in samples])
+        stages["find_closest_object"] /= len(samples)
+    timed(stages, "init_hinge_pairs", main.init_hinge_pairs)
+    timed(stages, "add_physics_all_object", main.add_physics_all_object, mytool.dem_threshold_float)
+
+    main.remove_physics_hinge(main.get_closest_hinges(samples[0]))
+    timed(stages, "calc_physics", main.calc_physics, mytool, args.frames)
+    scene.frame_set(frame=args.frames)
+    timed(stages, "evaluate_demolition", main.evaluate_demolition, 1, repeat=10)
+    scene.frame_set(frame=0)
+    timed(stages, "restore_scene_snapshot", main.restore_scene_snapshot, main.pristine_scene_snapshot)
+
+    return {"columns": columns, "levels": levels, "members": len(main.get_member_objects()),
+            "hinges": hinge_count, "frames": args.frames, "stages": stages}
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    prints the speed up of every stage compared to the baseline
+
+    :return: a list with the stages that are slower than tolerance times the baseline
+    """
+
+    regressions = []
+    baseline_results = {(result["columns"], result["levels"]): result for result in baseline["results"]}
+    for result in results:
+        size = (result["columns"], result["levels"])
+        if size not in baseline_results:
+            continue
+
+        for stage, duration in result["stages"].items():
+            baseline_duration = baseline_results[size]["stages"].get(stage)
+            if not baseline_duration:
+                continue
+
+            ratio = duration / baseline_duration
+            print(f"{size[0]}x{size[1]} {stage}: {ratio:.2f}x the baseline")
+            if ratio > tolerance:
+                regressions.append(f"{size[0]}x{size[1]} {stage}")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    args = parse_args(main.get_script_args())
+    seed(1)
+    main.register_properties()
+    bpy.context.scene.my_tool.dem_substeps_float = 10
+    bpy.context.scene.my_tool.dem_solver_iter_float = 10
+
+    results = []
+    for size in args.sizes.split(","):
+        columns, levels = (int(value) for value in size.split("x"))
+        results.append(benchmark_tower(columns, levels, args))
+
+    with open(args.output, "w") as file:
+        json.dump({"blender": bpy.app.version_string, "results": results}, file, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_with_baseline(results, json.load(file), args.tolerance)
+        if regressions:
+            print(f"regressions: {regressions}")
+            sys.exit(1)
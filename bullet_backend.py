@@ -0,0 +1,231 @@
+import json
+import argparse
+from collections import Counter
+import numpy as np
+import pybullet
+from pybullet_utils.bullet_client import BulletClient
+
+# distance between the two point constraints that together make up a hinge
+hinge_axis_length = 0.1
+# the hinges that carry at least this fraction of the breaking impulse at the end of a frame are checked after every
+# step of the next frame, all others only at the end of it
+watched_load = 0.5
+
+
+def load_scene_description(path):
+    """
+    loads a scene description that was exported by export_scene_description() in main.py
+
+    :param path: path of the json file
+    :return: the scene description
+    """
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def create_body(client, body):
+    """
+    creates a rigid body in the simulation
+
+    :param client: the bullet client
+    :param body: the description of the body
+    :return: the id of the body
+    """
+
+    vertices = np.array(body["vertices"]).reshape((-1, 3))
+    if body["type"] == "PASSIVE":
+        # a passive object like the ground is often a flat plane, which is better approximated by a thin box
+        half_extents = np.maximum((vertices.max(axis=0) - vertices.min(axis=0)) / 2, 0.05)
+        shape = client.createCollisionShape(pybullet.GEOM_BOX, halfExtents=half_extents.tolist(),
+                                            collisionFramePosition=((vertices.max(axis=0) + vertices.min(axis=0)) / 2)
+                                            .tolist())
+        mass = 0
+    else:
+        shape = create_collision_shape(client, body, vertices)
+        mass = body["mass"]
+
+    body_id = client.createMultiBody(baseMass=mass, baseCollisionShapeIndex=shape, basePosition=body["position"],
+                                     baseOrientation=body["orientation"])
+    client.changeDynamics(body_id, -1, lateralFriction=body["friction"], restitution=body["restitution"])
+    return body_id
+
+
+def create_collision_shape(client, body, vertices):
+    """
+    creates the collision shape of a non static body the way blender does: a primitive is sized to the dimensions of
+    the object and centred on its origin, with the axis of a capsule or cylinder along the local z axis. Any other shape
+    becomes the convex hull of the mesh, like a mesh shape of a moving body in blender.
+
+    :param client: the bullet client
+    :param body: the description of the body
+    :param vertices: the vertices of the mesh in the frame of the body
+    :return: the id of the collision shape
+    """
+
+    size_x, size_y, size_z = body.get("dimensions", vertices.max(axis=0) - vertices.min(axis=0))
+    radius = max(size_x, size_y) / 2
+    collision_shape = body.get("collision_shape", "CONVEX_HULL")
+
+    if collision_shape == "BOX":
+        return client.createCollisionShape(pybullet.GEOM_BOX, halfExtents=[size_x / 2, size_y / 2, size_z / 2])
+    if collision_shape == "SPHERE":
+        return client.createCollisionShape(pybullet.GEOM_SPHERE, radius=max(size_x, size_y, size_z) / 2)
+    if collision_shape == "CAPSULE":
+        # the height of a bullet capsule is the distance between the centres of its caps
+        return client.createCollisionShape(pybullet.GEOM_CAPSULE, radius=radius, height=max(size_z - 2 * radius, 0))
+    if collision_shape == "CYLINDER":
+        return client.createCollisionShape(pybullet.GEOM_CYLINDER, radius=radius, height=size_z)
+    return client.createCollisionShape(pybullet.GEOM_MESH, vertices=vertices.tolist())
+
+
+def to_body_frame(client, body_id, point):
+    """
+    converts a point in world space to the frame of a body
+
+    :param client: the bullet client
+    :param body_id: the id of the body
+    :param point: the point in world space
+    :return: the point in the frame of the body
+    """
+
+    position, orientation = client.getBasePositionAndOrientation(body_id)
+    inverse_position, inverse_orientation = client.invertTransform(position, orientation)
+    return client.multiplyTransforms(inverse_position, inverse_orientation, point, (0, 0, 0, 1))[0]
+
+
+def create_hinge(client, hinge, body_ids, max_force):
+    """
+    creates a hinge between two bodies out of two point constraints on the hinge axis
+
+    :param client: the bullet client
+    :param hinge: the description of the hinge
+    :param body_ids: dictionary from object name to body id
+    :param max_force: the largest force the constraints apply along any axis
+    :return: a list with the ids of the constraints
+    """
+
+    body1 = body_ids[hinge["object1"]]
+    body2 = body_ids[hinge["object2"]]
+    pivot = np.array(hinge["pivot"])
+    axis = np.array(hinge["axis"]) * hinge_axis_length / 2
+
+    constraint_ids = []
+    for point in (pivot + axis, pivot - axis):
+        constraint_id = client.createConstraint(body1, -1, body2, -1, pybullet.JOINT_POINT2POINT, (0, 0, 0),
+                                                to_body_frame(client, body1, point),
+                                                to_body_frame(client, body2, point))
+        client.changeConstraint(constraint_id, maxForce=max_force)
+        constraint_ids.append(constraint_id)
+    return constraint_ids
+
+
+def get_hinge_loads(client, hinges, names, max_force):
+    """
+    get the load of some hinges in the last step, a hinge with a load of 1 was clamped to max_force and breaks
+
+    :param client: the bullet client
+    :param hinges: dictionary from hinge name to the ids of its constraints
+    :param names: the names of the hinges
+    :param max_force: the largest force the constraints apply along any axis
+    :return: an array with the largest force of every hinge along any axis as a fraction of max_force
+    """
+
+    if not names:
+        return np.zeros(0)
+
+    forces = np.abs([[client.getConstraintState(constraint_id) for constraint_id in hinges[name]] for name in names])
+    return forces.reshape((len(names), -1)).max(axis=1) / max_force
+
+
+def simulate(scene, removed_hinges, params, frames):
+    """
+    simulates the demolition of the scene after removing some hinges. Like in blender, every frame advances the
+    simulation by speed / fps seconds in params["substeps"] steps, and a hinge breaks when the impulse on it reaches
+    the breaking threshold along any axis. Bullet clamps the force of a constraint to that impulse, so a hinge never
+    holds more than that. The clamped hinges are removed at the end of every frame, and the hinges close to breaking
+    after every step, see watched_load.
+
+    :param scene: the scene description, see load_scene_description()
+    :param removed_hinges: the names of the hinges that are removed
+    :param params: the simulation parameters as returned by get_sim_params() in main.py
+    :param frames: the frames at which the member locations are recorded, the first frame is frame 1
+    :return: an array of shape (len(frames), members, 3) with the locations of the members
+    """
+
+    client = BulletClient(connection_mode=pybullet.DIRECT)
+    try:
+        time_step = params["speed"] / scene["fps"] / params["substeps"]
+        client.setGravity(*scene["gravity"])
+        client.setPhysicsEngineParameter(fixedTimeStep=time_step, numSolverIterations=params["solver_iterations"],
+                                         numSubSteps=0)
+
+        body_ids = {body["name"]: create_body(client, body) for body in scene["bodies"]}
+        member_ids = [body_ids[name] for name in scene["members"]]
+
+        # the largest force of a constraint is the breaking impulse spread over a step
+        max_force = params["threshold"] / time_step
+        removed_hinges = set(removed_hinges)
+        hinges = {}
+        hinge_bodies = {}
+        # number of hinges that join every pair of bodies
+        joined_bodies = Counter()
+        for hinge in scene["hinges"]:
+            if hinge["name"] in removed_hinges or hinge["object1"] is None or hinge["object2"] is None:
+                continue
+            hinges[hinge["name"]] = create_hinge(client, hinge, body_ids, max_force)
+            hinge_bodies[hinge["name"]] = (body_ids[hinge["object1"]], body_ids[hinge["object2"]])
+            joined_bodies[hinge_bodies[hinge["name"]]] += 1
+            if params.get("collision_filtering"):
+                client.setCollisionFilterPair(*hinge_bodies[hinge["name"]], -1, -1, 0)
+
+        def break_hinges(names):
+            loads = get_hinge_loads(client, hinges, names, max_force)
+            for name in [name for name, load in zip(names, loads) if load >= 1 - 1e-6]:
+                for constraint_id in hinges.pop(name):
+                    client.removeConstraint(constraint_id)
+                joined_bodies[hinge_bodies[name]] -= 1
+                # like in blender, the members collide again once no hinge joins them
+                if params.get("collision_filtering") and joined_bodies[hinge_bodies[name]] == 0:
+                    client.setCollisionFilterPair(*hinge_bodies[name], -1, -1, 1)
+            return loads
+
+        locations = []
+        watched = []
+        frames = sorted(frames)
+        for frame in range(1, frames[-1] + 1):
+            if frame > 1:
+                for substep in range(0, params["substeps"] - 1):
+                    client.stepSimulation()
+                    break_hinges(watched)
+                    watched = [name for name in watched if name in hinges]
+                client.stepSimulation()
+
+                names = list(hinges)
+                loads = break_hinges(names)
+                watched = [name for name, load in zip(names, loads) if watched_load <= load < 1 - 1e-6]
+
+            if frame in frames:
+                locations.append([client.getBasePositionAndOrientation(body_id)[0] for body_id in member_ids])
+
+        return np.array(locations).reshape((len(frames), -1, 3))
+    finally:
+        client.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="simulate an exported demolition scene without blender")
+    parser.add_argument("scene", help="json file written by main.py --export-scene")
+    parser.add_argument("--remove", nargs="*", default=[], help="names of the hinges that are removed")
+    parser.add_argument("--frame", type=int, default=98, help="frame at which the demolition is measured")
+    parser.add_argument("--threshold", type=float, default=4000)
+    parser.add_argument("--substeps", type=int, default=30)
+    parser.add_argument("--solver-iterations", type=int, default=30)
+    parser.add_argument("--speed", type=float, default=3)
+    args = parser.parse_args()
+
+    member_locations = simulate(load_scene_description(args.scene), args.remove,
+                                {"threshold": args.threshold, "substeps": args.substeps,
+                                 "solver_iterations": args.solver_iterations, "speed": args.speed}, [args.frame])[-1]
+    print(f"r {np.sqrt(member_locations[:, 0] ** 2 + member_locations[:, 1] ** 2).max(initial=0)}")
+    print(f"h {member_locations[:, 2].max(initial=0)}")
@@ -1,11 +1,27 @@
 import bpy
 import sys
 import time
-from random import seed
+import json
+import atexit
+import argparse
+import csv
+import cProfile
+import pstats
+import threading
+from contextlib import contextmanager
+import queue
+import sqlite3
+import hashlib
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from random import seed, getstate, setstate
 from random import randint
 from random import random
-from math import radians, sqrt, cos, sin
+from math import radians, cos, sin, ceil
 from mathutils import Matrix, Vector
+from mathutils.kdtree import KDTree
+import numpy as np
 import os
 
 sys.path.append('/home/job/.local/lib/python3.7/site-packages')
@@ -20,27 +36,204 @@ materials = {
 max_chromosome_size = 10
 # pool_size must be a mutiple of 4 due to function mutatechromosomes()
 chromosome_pool_size = 8
-chromosomes_idxs = [[]] * chromosome_pool_size
+# number of background blender processes that evaluate a generation in parallel, 0 evaluates in this process
+worker_pool_size = 0
+# breed a new chromosome as soon as a worker is free instead of evaluating whole generations, see run_steady_state()
+steady_state = False
+# filled with chromosomes without clusters by init_hinge_set(), because their size depends on the number of hinges
+chromosomes_idxs = []
 chromosome_fitness = [0] * chromosome_pool_size
 generation = 0
+# the scores of every generation as returned by run_generation() and run_steady_state()
+generation_history = []
+# number of chromosomes run_steady_state() evaluated
+evaluation_count = 0
+
+# file the state of the genetic algorithm is saved to every checkpoint_interval generations, see save_checkpoint().
+# None saves it next to the .blend file, and a checkpoint_interval of 0 disables the checkpoints. The user interface
+# does not write checkpoints, the headless runner does every generation unless --checkpoint-interval says otherwise
+checkpoint_path = None
+checkpoint_interval = 0
+
+# check every chromosome on the connectivity graph before it is simulated, see prescreen_chromosome(). "off" simulates
+# every chromosome, "downrank" gives hopeless chromosomes the score of a standing tower without simulating them and
+# "reject" replaces them by new chromosomes
+prescreen_mode = "off"
+prescreen_retries = 10
+# a chromosome is hopeless when it detaches less than prescreen_detached_fraction of the mass from the supports and
+# removes less than prescreen_cut_fraction of the hinges that cross any horizontal plane through the structure
+prescreen_detached_fraction = 0.01
+prescreen_cut_fraction = 0.2
+# members with an end this close to the lowest end of all members stand on the ground
+support_tolerance = 0.5
+# member-hinge graph of the structure, see init_connectivity_graph()
+connectivity_graph = None
+
+# optimise the objectives of demolition_objectives() with NSGA-II instead of their weighted score, see
+# run_generation_nsga2(). chromosome_fitness then holds the weighted score of chromosome_objectives
+multi_objective = False
+chromosome_objectives = []
+# the non dominated chromosomes of all generations, as dictionaries with the chromosome and its objectives
+pareto_archive = []
+pareto_archive_size = 500
 
 accept_new_block = 0.8
 mutation_rate = 0.35
 
+# frame of the simulation that evaluate_chromosome() scores
+evaluation_frame = 98
+# score the member locations at evaluation_frame ("frame"), or the whole trajectory up to evaluation_frame
+# ("trajectory"), see evaluate_trajectory()
+fitness_mode = "frame"
+# the structure has fallen when it is lower than this fraction of its starting height
+fall_height_fraction = 0.2
+# a member hits the ground when its center comes below this height
+impact_height = 1.0
+# advance the simulation in chunks of frames and stop as soon as the outcome is clear, see calc_physics_stepped()
+stepped_bake = False
+stepped_bake_chunk = 10
+# the structure has settled when no member moved more than this distance during the last chunk
+settle_distance = 0.05
+# a structure that still stands at standing_height_fraction of its height at this frame is not going to fall
+standing_check_frame = 40
+standing_height_fraction = 0.95
+# collision shape of all active objects instead of the one in materials, None uses the materials and "AUTO" fits the
+# cheapest shape to every object, see fit_collision_shape()
+collision_shape_override = None
+# a primitive shape fits an object when its volume is within this fraction of the volume of the mesh
+shape_fit_tolerance = 0.15
+fitted_shapes = {}
+# members that are joined by a hinge do not collide with each other, until the hinge is removed
+collision_filtering = False
+# "settle" lets members sleep once they move slower than the deactivation velocities, "far" also starts the members
+# further than deactivation_distance from every removed hinge asleep, see update_start_deactivated(). A sleeping
+# member wakes up when an awake member hits it. "off" simulates every member in every substep
+deactivation_mode = "off"
+deactivation_linear_velocity = 0.4
+deactivation_angular_velocity = 0.5
+deactivation_distance = 10
+# only the hinges up to this height are candidates for removal, None makes every hinge a candidate
+candidate_max_height = None
+# merge the members that are held together by hinges that are no candidates into compound rigid bodies, so only the
+# candidate hinges stay constraints, see add_compound_bodies()
+compound_bodies = False
+# names of the compound objects and of the hinges whose constraint they replace
+compound_objects = []
+compound_hinges = []
+# indexes of the candidate hinges that ended up inside a compound body, removing them would change nothing, so they are
+# no candidates while the compound bodies exist
+merged_candidates = []
+
+# simulate with "blender" or with the standalone "bullet" backend of bullet_backend.py, which needs pybullet
+physics_backend = "blender"
+# scene description the bullet backend simulates, see export_scene_description()
+bullet_scene = None
+
+# settings calibrate_fidelity() compares with calibration_reference, a setting is good enough when the rank
+# correlation of its scores with the reference is at least calibration_min_correlation and its mean score error at
+# most calibration_max_error
+calibration_reference = {"substeps": 60, "solver_iterations": 60, "speed": 3}
+calibration_grid = {"substeps": [5, 10, 20, 30], "solver_iterations": [5, 10, 20, 30], "speed": [3, 5]}
+calibration_min_correlation = 0.9
+calibration_max_error = 0.05
+
+# evaluate every chromosome with the cheap surrogate_params first, and only re-evaluate the best surrogate_fraction
+# of them with the full simulation parameters
+use_surrogate = False
+surrogate_fraction = 0.25
+surrogate_params = {"substeps": 5, "solver_iterations": 5, "collision_shape": "BOX", "evaluation_frame": 60}
+# every this many generations the whole pool is also evaluated with the full simulation parameters, so the rank
+# correlation between the surrogate and the full scores is measured on an unselected sample. 0 never measures it
+surrogate_calibration_interval = 5
+# rank correlation between the surrogate and the full scores of every calibration generation
+surrogate_correlations = []
+
 hinge_set = []
+# lookup structures of hinge_set, built once by init_hinge_set()
+hinge_set_idx = {}
+hinge_positions = np.zeros((0, 3))
+hinge_kdtree = None
+# (object1, object2) names of the constraint of every hinge, computed once per model by init_hinge_pairs()
+hinge_pairs = {}
+# indexes of the member objects in the scene, see get_member_idxs()
+member_idxs = None
+member_idxs_scene_size = 0
 displayed_demolition = []
 physics_added = False
+# indexes of the hinges whose constraint is currently disabled
+removed_hinges = set()
+# physics of the scene right after add_physics_all_object(), see capture_physics_state()
+pristine_physics_state = None
+# transforms and constraint flags of the scene right after add_physics_all_object(), see capture_scene_snapshot()
+pristine_scene_snapshot = None
+# compare the scene to pristine_physics_state after restoring the removed hinges of a chromosome
+check_physics_state = True
+
+# fitness scores of evaluated chromosomes, keyed by chromosome_key()
+fitness_cache = OrderedDict()
+# number of scores kept in memory, the least recently used scores are dropped first
+fitness_cache_size = 4096
+# sqlite file the fitness scores are also stored in, so they survive between sessions. None disables it
+fitness_cache_path = None
+fitness_cache_db = None
+
+# directory where the member matrices of every baked frame are stored, so a known demolition can be replayed or
+# re-scored without simulating it again. None disables the bake cache
+bake_cache_dir = None
+# maximum size of the bake cache in bytes, the least recently used bakes are deleted first
+bake_cache_size = 2 * 1024 ** 3
+model_hash = None
+# the cached bake that is played by play_cached_bake() and the scene before it started playing
+cached_playback = None
+cached_playback_snapshot = None
+
+# file the stage timings of every chromosome and generation are appended to, as json lines or as csv when the name
+# ends with .csv. None disables the timing log
+timing_log_path = None
+timing_stages = ["teardown", "removal", "bake", "evaluation", "rearm"]
+# stage timings of the chromosome that is evaluated, see timed_stage()
+stage_timings = {}
+# summed stage timings of the current generation
+generation_timings = {}
+timing_lock = threading.Lock()
+# profile evaluate_chromosome() with "cprofile" or "pyinstrument", the results are written to profile_path
+profiler = None
+profile_path = "demolition.prof"
+evaluation_profiler = None
+
+# prefix of the lines a worker process writes to stdout, everything else is regular blender/print output
+worker_message_prefix = "DEMOLITION_WORKER "
+worker_processes = []
 
 
 def init_hinge_set():
     """
-    set the global hinge_set list to contain all the hinge object names
+    set the global hinge_set list to contain all the hinge object names. It also captures the hinge positions and
+    builds a kd-tree over them, so neighbouring hinges can be found without scanning the scene.
     """
 
+    global hinge_positions, hinge_kdtree, chromosomes_idxs, model_hash
     for obj in bpy.context.scene.objects:
         if obj.name.startswith("hinge"):
             hinge_set.append(obj.name)
 
+    hinge_set_idx.clear()
+    for idx, hinge_name in enumerate(hinge_set):
+        hinge_set_idx[hinge_name] = idx
+
+    hinge_positions = np.array([bpy.context.scene.objects[hinge_name].matrix_world.translation
+                                for hinge_name in hinge_set]).reshape((-1, 3))
+
+    hinge_kdtree = KDTree(len(hinge_set))
+    for idx, position in enumerate(hinge_positions):
+        hinge_kdtree.insert(position, idx)
+    hinge_kdtree.balance()
+
+    chromosomes_idxs = [empty_chromosome() for idx in range(0, chromosome_pool_size)]
+    model_hash = None
+    # the object names of another model may be the same, but not their meshes
+    fitted_shapes.clear()
+
 
 def get_hinge_set_idx(hinge_name):
     """
@@ -50,25 +243,135 @@ def get_hinge_set_idx(hinge_name):
     :return: index of the hinge_name
     """
 
-    for idx in range(0, len(hinge_set)):
-        if hinge_name == hinge_set[idx]:
-            return idx
+    return hinge_set_idx.get(hinge_name, -1)
+
+
+@contextmanager
+def timed_stage(name):
+    """
+    adds the wall time of the code in the with block to the stage timings of the current chromosome
+
+    :param name: name of the stage, one of timing_stages
+    """
 
-    return -1
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_timings[name] = stage_timings.get(name, 0) + time.perf_counter() - start_time
 
 
-def calc_physics(mytool):
+def calc_physics(mytool, last_frame=100):
     """
     computes the animation of the current configuration.
+
+    :param last_frame: the last frame that is baked
     """
 
-    bpy.ops.ptcache.free_bake_all()
+    with timed_stage("teardown"):
+        bpy.ops.ptcache.free_bake_all()
     bpy.context.scene.rigidbody_world.time_scale = mytool.dem_speed_float
     bpy.context.scene.rigidbody_world.substeps_per_frame = int(mytool.dem_substeps_float)
     bpy.context.scene.rigidbody_world.solver_iterations = int(mytool.dem_solver_iter_float)
     bpy.context.scene.frame_start = 1
-    bpy.context.scene.frame_end = 100
-    bpy.ops.ptcache.bake_all(bake=True)
+    bpy.context.scene.frame_end = last_frame
+    with timed_stage("bake"):
+        bpy.ops.ptcache.bake_all(bake=True)
+
+
+def get_member_idxs():
+    """
+    get the indexes of the member objects (see get_member_objects()) in bpy.context.scene.objects. The indexes are
+    cached until the number of objects in the scene changes.
+
+    :return: an integer array with the indexes
+    """
+
+    global member_idxs, member_idxs_scene_size
+    objects = bpy.context.scene.objects
+    if member_idxs is None or member_idxs_scene_size != len(objects):
+        prefixes = tuple(m for m in materials if m != "ground")
+        member_idxs = np.array([idx for idx, obj in enumerate(objects) if obj.name.startswith(prefixes)],
+                               dtype=np.int64)
+        member_idxs_scene_size = len(objects)
+    return member_idxs
+
+
+def get_member_matrices():
+    """
+    get the world matrices of all member objects at the current frame. The matrices of all objects are read at once
+    with foreach_get instead of one object at the time.
+
+    :return: an array of shape (members, 4, 4)
+    """
+
+    objects = bpy.context.scene.objects
+    matrices = np.zeros(len(objects) * 16, dtype=np.float32)
+    objects.foreach_get("matrix_world", matrices)
+    # blender matrices are stored column by column
+    return matrices.reshape((-1, 4, 4))[get_member_idxs()].transpose((0, 2, 1))
+
+
+def get_member_locations():
+    """
+    get the world locations of all member objects at the current frame
+
+    :return: an array of shape (members, 3)
+    """
+
+    return get_member_matrices()[:, :3, 3].astype(np.float64)
+
+
+def calc_physics_stepped(mytool, last_frame, early_stop=True):
+    """
+    computes the animation of the current configuration frame by frame up to last_frame, and records the member
+    matrices of every frame while it is simulated. With early_stop, the simulation is checked every stepped_bake_chunk
+    frames and stopped early when
+    - the structure came down and has settled, so the score will not change anymore, or
+    - the structure still stands at standing_check_frame, so it is a failed demolition.
+
+    :param mytool: the scene properties (scene.my_tool)
+    :param last_frame: the last frame that has to be simulated
+    :param early_stop: stop the simulation as soon as the outcome is clear
+    :return: an array of shape (frames, members, 4, 4) starting at frame 1, the last frame is the frame the
+    simulation stopped at
+    """
+
+    scene = bpy.context.scene
+    with timed_stage("teardown"):
+        bpy.ops.ptcache.free_bake_all()
+    scene.rigidbody_world.time_scale = mytool.dem_speed_float
+    scene.rigidbody_world.substeps_per_frame = int(mytool.dem_substeps_float)
+    scene.rigidbody_world.solver_iterations = int(mytool.dem_solver_iter_float)
+    scene.frame_start = 1
+    scene.frame_end = last_frame
+
+    scene.frame_set(frame=1)
+    bake = [get_member_matrices()]
+    chunk_locations = bake[0][:, :3, 3]
+    start_height = chunk_locations[:, 2].max(initial=0)
+
+    # the rigid body world only simulates when the frames are set one after the other
+    for frame in range(2, last_frame + 1):
+        with timed_stage("bake"):
+            scene.frame_set(frame=frame)
+        bake.append(get_member_matrices())
+        if not early_stop or frame % stepped_bake_chunk != 0:
+            continue
+
+        locations = bake[-1][:, :3, 3]
+        moved = np.linalg.norm(locations - chunk_locations, axis=1).max(initial=0)
+        chunk_locations = locations
+
+        standing = locations[:, 2].max(initial=0) >= standing_height_fraction * start_height
+        if standing and frame >= standing_check_frame:
+            print(f"still standing at frame {frame}")
+            break
+        if not standing and moved < settle_distance:
+            print(f"settled at frame {frame}")
+            break
+
+    return np.array(bake)
 
 
 def get_closest_hinges(hinge_idx):
@@ -80,21 +383,125 @@ def get_closest_hinges(hinge_idx):
     :return: a list with indexes of hinges close to the hinge with hinge_idx
     """
 
-    hinge = bpy.context.scene.objects[hinge_set[hinge_idx]]
-
     radius = 0.5
-    closest_hinges = []
-    for obj in bpy.context.scene.objects:
-        if obj.name.startswith("hinge"):
-            delta_x = hinge.matrix_world.translation[0] - obj.matrix_world.translation[0]
-            delta_y = hinge.matrix_world.translation[1] - obj.matrix_world.translation[1]
-            delta_z = hinge.matrix_world.translation[2] - obj.matrix_world.translation[2]
+    closest_hinges = [idx for position, idx, dist in hinge_kdtree.find_range(hinge_positions[hinge_idx], radius)
+                      if dist < radius]
+
+    # keep the hinges in scene order, like a scan over the scene would return them
+    return sorted(closest_hinges)
+
+
+def get_candidate_hinges():
+    """
+    get the hinges that the genetic algorithm may remove, see candidate_max_height
+
+    :return: an integer array with indexes in hinge_set
+    """
+
+    if candidate_max_height is None:
+        candidates = np.arange(len(hinge_set))
+    else:
+        candidates = np.flatnonzero(hinge_positions[:, 2] <= candidate_max_height)
+    return np.setdiff1d(candidates, merged_candidates) if merged_candidates else candidates
+
+
+def hinge_mask(hinge_idxs):
+    """
+    packs hinge indexes in a bitset over hinge_set. Like np.packbits, hinge i is bit 7 - i % 8 of byte i // 8.
+
+    :param hinge_idxs: indexes of hinges in hinge_set
+    :return: a uint8 array of (len(hinge_set) + 7) // 8 bytes
+    """
+
+    hinge_idxs = np.asarray(hinge_idxs, dtype=np.int64)
+    mask = np.zeros((len(hinge_set) + 7) // 8, dtype=np.uint8)
+    np.bitwise_or.at(mask, hinge_idxs >> 3, (0x80 >> (hinge_idxs & 7)).astype(np.uint8))
+    return mask
+
+
+def mask_hinges(mask):
+    """
+    unpacks a bitset over hinge_set, see hinge_mask()
+
+    :param mask: the bitset
+    :return: a sorted list with the indexes of the hinges in the bitset
+    """
+
+    return np.flatnonzero(np.unpackbits(mask)[:len(hinge_set)]).tolist()
+
+
+def get_hinge_cluster(hinge_idx):
+    """
+    get the gene of a chromosome that removes the candidate hinges close to the hinge of hinge_idx, see
+    get_closest_hinges()
+
+    :param hinge_idx: idx of the hinge to consider
+    :return: the bitset of the hinges in the cluster
+    """
+
+    cluster = hinge_mask(get_closest_hinges(hinge_idx))
+    if candidate_max_height is not None:
+        cluster &= hinge_mask(get_candidate_hinges())
+    return cluster
 
-            dist = sqrt(delta_x ** 2 + delta_y ** 2 + delta_z ** 2)
-            if dist < radius:
-                closest_hinges.append(get_hinge_set_idx(obj.name))
 
-    return closest_hinges
+def empty_chromosome():
+    """
+    A chromosome is a uint8 array of shape (clusters, (len(hinge_set) + 7) // 8), every row is the bitset of the hinges
+    of a cluster (gene), see hinge_mask(). Crossover and mutation pick and replace rows, and the hinges a chromosome
+    removes are the bitwise or of its rows.
+
+    :return: a chromosome without clusters
+    """
+
+    return np.zeros((0, (len(hinge_set) + 7) // 8), dtype=np.uint8)
+
+
+def removed_hinge_mask(chromosome):
+    """
+    get the bitset of the hinges that a chromosome removes
+
+    :param chromosome: the chromosome
+    :return: the bitset, see hinge_mask()
+    """
+
+    return np.bitwise_or.reduce(chromosome, axis=0)
+
+
+def chromosome_hinges(chromosome):
+    """
+    get the hinges that a chromosome removes
+
+    :param chromosome: the chromosome
+    :return: a sorted list with the indexes of the hinges in hinge_set
+    """
+
+    return mask_hinges(removed_hinge_mask(chromosome))
+
+
+def chromosome_to_lists(chromosome):
+    """
+    converts a chromosome to a list of hinge clusters, which can be stored as json
+
+    :param chromosome: the chromosome
+    :return: a list with a list of hinge indexes per cluster
+    """
+
+    return [mask_hinges(row) for row in chromosome]
+
+
+def chromosome_from_lists(clusters):
+    """
+    converts a list of hinge clusters back to a chromosome, see chromosome_to_lists()
+
+    :param clusters: a list with a list of hinge indexes per cluster
+    :return: the chromosome
+    """
+
+    chromosome = empty_chromosome()
+    if clusters:
+        chromosome = np.array([hinge_mask(cluster) for cluster in clusters], dtype=np.uint8)
+    return chromosome
 
 
 def find_position_sides(obj):
@@ -149,397 +556,2867 @@ def find_closest_object(this_obj):
                     if -threshold < (this_obj.matrix_world.translation - p).length < threshold:
                         return obj
 
-    return None
+    return None
+
+
+def get_member_objects():
+    """
+    get all objects that are part of the structure, so every object with a material except the ground
+
+    :return: a list of objects in scene order
+    """
+
+    prefixes = tuple(m for m in materials if m != "ground")
+    return [obj for obj in bpy.context.scene.objects if obj.name.startswith(prefixes)]
+
+
+def find_position_sides_all(objects):
+    """
+    vectorised version of find_position_sides() for a list of objects
+
+    :param objects: the objects to find the sides for
+    :return: an array of shape (len(objects), 3, 3) with both end points and the location of every object
+    """
+
+    rotations = np.array([obj.rotation_euler for obj in objects]).reshape((-1, 3))
+    scale_z = np.array([obj.scale[2] for obj in objects])
+    translations = np.array([obj.matrix_world.translation for obj in objects]).reshape((-1, 3))
+    locations = np.array([obj.location for obj in objects]).reshape((-1, 3))
+
+    cos_rot = np.cos(rotations)
+    sin_rot = np.sin(rotations)
+    ones = np.ones(len(objects))
+    zeros = np.zeros(len(objects))
+    x_rot_matrix = np.array([[ones, zeros, zeros],
+                             [zeros, cos_rot[:, 0], -sin_rot[:, 0]],
+                             [zeros, sin_rot[:, 0], cos_rot[:, 0]]]).transpose((2, 0, 1))
+    y_rot_matrix = np.array([[cos_rot[:, 1], zeros, sin_rot[:, 1]],
+                             [zeros, ones, zeros],
+                             [-sin_rot[:, 1], zeros, cos_rot[:, 1]]]).transpose((2, 0, 1))
+    z_rot_matrix = np.array([[cos_rot[:, 2], -sin_rot[:, 2], zeros],
+                             [sin_rot[:, 2], cos_rot[:, 2], zeros],
+                             [zeros, zeros, ones]]).transpose((2, 0, 1))
+
+    # (0, 0, scale) @ x_rot_matrix @ y_rot_matrix @ z_rot_matrix is the scaled last row of the product
+    end_points = scale_z[:, None] * (x_rot_matrix @ y_rot_matrix @ z_rot_matrix)[:, 2, :]
+
+    return np.stack((translations + end_points, translations - end_points, locations), axis=1)
+
+
+def init_hinge_pairs():
+    """
+    computes the objects every hinge connects and stores them in the global hinge_pairs dictionary. object1 is the
+    parent of the hinge and object2 is the same object find_closest_object() returns, but all end points are computed
+    at once and looked up in a kd-tree instead of searching the scene for every hinge.
+    """
+
+    threshold = 1
+    members = get_member_objects()
+    sides = find_position_sides_all(members).reshape((-1, 3))
+
+    sides_kdtree = KDTree(len(sides))
+    for idx, position in enumerate(sides):
+        sides_kdtree.insert(position, idx)
+    sides_kdtree.balance()
+
+    hinge_pairs.clear()
+    for hinge_name in hinge_set:
+        hinge = bpy.context.scene.objects[hinge_name]
+        # find_closest_object() returns the first match in scene order, so take the lowest member index
+        member_idxs = [idx // 3 for position, idx, dist in sides_kdtree.find_range(hinge.matrix_world.translation,
+                                                                                   threshold)
+                       if dist < threshold and members[idx // 3] != hinge.parent]
+        paired_obj = members[min(member_idxs)] if member_idxs else None
+
+        hinge_pairs[hinge_name] = (hinge.parent.name if hinge.parent else None,
+                                   paired_obj.name if paired_obj else None)
+
+
+def get_hinge_pair(obj):
+    """
+    get the objects that the constraint of a hinge connects
+
+    :param obj: the hinge object
+    :return: a tuple with object1 and object2 of the hinge, both can be None
+    """
+
+    if obj.name not in hinge_pairs:
+        return obj.parent, find_closest_object(obj)
+
+    return tuple(bpy.context.scene.objects[name] if name else None for name in hinge_pairs[obj.name])
+
+
+def init_connectivity_graph():
+    """
+    builds the member-hinge graph of the structure from the hinge pairs and stores it in the global
+    connectivity_graph. The members are the nodes and every hinge that connects two members is an edge. Besides the
+    edges, the graph holds for every horizontal plane through a hinge the bitset of the hinges that cross it, which are
+    the hinges between a member below and a member above the plane.
+    """
+
+    global connectivity_graph
+    if not hinge_pairs:
+        init_hinge_pairs()
+
+    members = get_member_objects()
+    member_idx = {obj.name: idx for idx, obj in enumerate(members)}
+    pairs = [hinge_pairs.get(hinge_name, (None, None)) for hinge_name in hinge_set]
+    edge_a = np.array([member_idx.get(pair[0], -1) for pair in pairs], dtype=np.int64)
+    edge_b = np.array([member_idx.get(pair[1], -1) for pair in pairs], dtype=np.int64)
+    valid = (edge_a >= 0) & (edge_b >= 0)
+
+    masses = get_member_masses()
+    if masses.sum() == 0:
+        masses = np.ones(len(members))
+    locations = get_member_locations()
+    lowest_ends = find_position_sides_all(members)[:, :, 2].min(axis=1)
+    supports = lowest_ends <= lowest_ends.min(initial=0) + support_tolerance
+
+    heights = locations[:, 2]
+    low = np.where(valid, np.minimum(heights[edge_a], heights[edge_b]), np.inf)
+    high = np.where(valid, np.maximum(heights[edge_a], heights[edge_b]), -np.inf)
+    planes = np.unique(np.round(hinge_positions[:, 2], 2)) if len(hinge_positions) else np.zeros(0)
+    crossing = (low[np.newaxis] < planes[:, np.newaxis]) & (planes[:, np.newaxis] <= high[np.newaxis])
+    crossing_counts = crossing.sum(axis=1)
+    crossing = crossing[crossing_counts > 0]
+
+    max_radius, max_height = demolition_metrics(locations)
+    connectivity_graph = {"edges": (edge_a[valid], edge_b[valid]), "edge_hinges": np.flatnonzero(valid),
+                          "masses": masses, "supports": supports, "crossing": np.packbits(crossing, axis=1),
+                          "crossing_counts": crossing_counts[crossing_counts > 0],
+                          "start_radius": float(max_radius), "start_height": float(max_height)}
+    print(f"connectivity graph: {len(members)} members, {int(valid.sum())} hinges, {int(supports.sum())} supports, "
+          f"{len(crossing)} planes")
+
+
+def connected_components(node_count, edge_a, edge_b):
+    """
+    labels the connected components of a graph by propagating the lowest node index over the edges, with pointer
+    jumping so it takes about log(diameter) numpy passes instead of a python loop over the edges
+
+    :param node_count: the number of nodes
+    :param edge_a: an array with the first node of every edge
+    :param edge_b: an array with the second node of every edge
+    :return: an array with the label of every node, nodes of the same component get the same label
+    """
+
+    labels = np.arange(node_count)
+    while True:
+        lowest = np.minimum(labels[edge_a], labels[edge_b])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, edge_a, lowest)
+        np.minimum.at(new_labels, edge_b, lowest)
+        new_labels = new_labels[new_labels]
+        if np.array_equal(new_labels, labels):
+            return labels
+        labels = new_labels
+
+
+def demolition_metrics(locations):
+    """
+    computes the maximum radius and height of the member objects
+
+    :param locations: an array of shape (..., members, 3) with the member locations of one or more frames
+    :return: the maximum radius and the maximum height, with the shape of the leading dimensions of locations
+    """
+
+    max_height = locations[..., 2].max(axis=-1, initial=0)
+    max_radius = np.sqrt(locations[..., 0] ** 2 + locations[..., 1] ** 2).max(axis=-1, initial=0)
+    return max_radius, max_height
+
+
+def score_demolition(max_radius, max_height, removed_clusters, w_r=3, w_h=5, w_d=1, hard_max_removed_clusters=36,
+                     hard_max_radius=50, hard_max_height=50):
+    """
+    computes the evaluation score of a demolition from its metrics. All metrics may be arrays to score several frames
+    or demolitions at once. See evaluate_demolition() for the parameters.
+
+    :return: the resulting evaluation between [0,1]
+    """
+
+    r_norm = np.minimum(max_radius / hard_max_radius, 1)
+    h_norm = np.minimum(max_height / hard_max_height, 1)
+    d_norm = np.minimum(removed_clusters / hard_max_removed_clusters, 1)
+
+    return (w_r * (1 - r_norm) + w_h * (1 - h_norm) ** 3 + w_d * (1 - d_norm)) / (w_r + w_h + w_d)
+
+
+# before executing this script. MAKE SURE YOUR BUILD IS CENTERED AROUND ITS ORIGIN.
+# otherwise the evaluation might not work properly
+def evaluate_demolition(removed_clusters, w_r=3, w_h=5, w_d=1, hard_max_removed_clusters=36, hard_max_radius=50,
+                        hard_max_height=50):
+    """
+    evaluates the demolition of the current selected frame
+
+    :param w_d: weight factor for imploded objects
+    :param w_h: weight factor for height
+    :param w_r: weight factor for radius
+    :param removed_clusters: number of objects that were removed in the simulation
+    :param hard_max_removed_clusters: maximum number of objects that can be removed in the simulation
+    :param hard_max_radius: maximum demolition radius.
+    :param hard_max_height: maximum height of the building (default is the height of the building aka 50 meters)
+    :return: the resulting evaluation between [0,1]
+    """
+
+    max_radius, max_height = demolition_metrics(get_member_locations())
+
+    r_norm = min(max_radius / hard_max_radius, 1)
+    h_norm = min(max_height / hard_max_height, 1)
+    d_norm = min(removed_clusters / hard_max_removed_clusters, 1)
+
+    print(f"r{max_radius}")
+    print(f"h {max_height}")
+    print(f"d {removed_clusters}")
+    print(f"r_norm {r_norm}")
+    print(f"h_norm {h_norm}")
+    print(f"d_norm {d_norm}")
+
+    return float(score_demolition(max_radius, max_height, removed_clusters, w_r, w_h, w_d, hard_max_removed_clusters,
+                                  hard_max_radius, hard_max_height))
+
+
+def get_member_masses():
+    """
+    get the masses of the rigid bodies of the member objects
+
+    :return: an array of shape (members,)
+    """
+
+    return np.array([obj.rigid_body.mass if obj.rigid_body else 0 for obj in get_member_objects()])
+
+
+def trajectory_metrics(trajectory, masses, frame_time):
+    """
+    computes the metrics of a demolition from the member locations of every frame
+
+    :param trajectory: an array of shape (frames, members, 3) with the member locations starting at frame 1
+    :param masses: an array of shape (members,) with the masses of the members
+    :param frame_time: the simulated time between two frames in seconds
+    :return: a dictionary with
+    - peak_radius: the maximum radius of the members over all frames
+    - final_height: the maximum height of the members at the last frame
+    - fall_frames: the number of frames until the structure is lower than fall_height_fraction of its starting
+      height, or the number of frames if it never gets that low
+    - impact_momentum: the largest momentum of a member at the moment it hits the ground
+    - reference_momentum: the momentum of the heaviest member after falling from the starting height
+    """
+
+    max_radius, max_height = demolition_metrics(trajectory)
+    start_height = max_height[0]
+    fallen = max_height < fall_height_fraction * start_height
+
+    speeds = np.linalg.norm(np.diff(trajectory, axis=0), axis=2) / frame_time
+    # a member hits the ground in the frame its center comes below impact_height
+    impacts = (trajectory[:-1, :, 2] >= impact_height) & (trajectory[1:, :, 2] < impact_height)
+    momentum = speeds * masses
+
+    return {"peak_radius": float(max_radius.max(initial=0)),
+            "final_height": float(max_height[-1]),
+            "fall_frames": int(np.argmax(fallen)) + 1 if fallen.any() else len(trajectory),
+            "impact_momentum": float(momentum[impacts].max(initial=0)),
+            "reference_momentum": float(masses.max(initial=0) * np.sqrt(2 * 9.81 * start_height))}
+
+
+def score_trajectory(max_radius, max_height, removed_clusters, fall_time, impact, w_r=3, w_h=5, w_d=1, w_t=1, w_p=1,
+                     hard_max_removed_clusters=36, hard_max_radius=50, hard_max_height=50):
+    """
+    computes the evaluation score of a demolition from its trajectory objectives, see trajectory_objectives(). Besides
+    the terms of score_demolition(), a demolition scores better when it falls sooner and when its members hit the
+    ground with less momentum.
+
+    :param fall_time: the time it takes to fall as a fraction of the trajectory
+    :param impact: the momentum at ground impact as a fraction of the reference momentum
+    :param w_t: weight factor for the time it takes to fall
+    :param w_p: weight factor for the momentum at ground impact
+    :return: the resulting evaluation between [0,1]
+    """
+
+    score = score_demolition(max_radius, max_height, removed_clusters, w_r, w_h, w_d, hard_max_removed_clusters,
+                             hard_max_radius, hard_max_height) * (w_r + w_h + w_d)
+    return float((score + w_t * (1 - fall_time) + w_p * (1 - impact)) / (w_r + w_h + w_d + w_t + w_p))
+
+
+def trajectory_objectives(trajectory, removed_clusters, masses=None):
+    """
+    computes the objectives of a demolition from its whole trajectory up to evaluation_frame. A trajectory that
+    stopped early (see calc_physics_stepped()) stays at its last frame.
+
+    :param trajectory: an array of shape (frames, members, 3) with the member locations starting at frame 1
+    :param removed_clusters: number of objects that were removed in the simulation
+    :param masses: the masses of the members, defaults to the masses of the rigid bodies
+    :return: a list with the peak radius, the final height, the removed clusters, the fall time as a fraction of the
+    trajectory and the momentum at ground impact as a fraction of the reference momentum, see trajectory_metrics()
+    """
+
+    trajectory = trajectory[:evaluation_frame]
+    if len(trajectory) < evaluation_frame:
+        trajectory = np.concatenate([trajectory, np.repeat(trajectory[-1:], evaluation_frame - len(trajectory), 0)])
+    if masses is None:
+        masses = get_member_masses()
+
+    render = bpy.context.scene.render
+    frame_time = bpy.context.scene.my_tool.dem_speed_float * render.fps_base / render.fps
+    metrics = trajectory_metrics(trajectory, masses, frame_time)
+    for name, value in metrics.items():
+        print(f"{name} {value}")
+
+    impact = metrics["impact_momentum"] / metrics["reference_momentum"] if metrics["reference_momentum"] else 0
+    return [metrics["peak_radius"], metrics["final_height"], removed_clusters,
+            metrics["fall_frames"] / evaluation_frame, min(impact, 1)]
+
+
+def evaluate_trajectory(trajectory, removed_clusters, masses=None):
+    """
+    evaluates a demolition on its whole trajectory, see trajectory_objectives() and score_trajectory()
+
+    :return: the resulting evaluation between [0,1]
+    """
+
+    return score_trajectory(*trajectory_objectives(trajectory, removed_clusters, masses))
+
+
+def demolition_objectives(locations, removed_clusters, masses=None):
+    """
+    computes the objectives of a demolition for the multi objective optimisation, all of them are minimised. With the
+    "frame" fitness_mode these are the radius and height at evaluation_frame and the removed clusters, with the
+    "trajectory" fitness_mode see trajectory_objectives().
+
+    :param locations: an array of shape (frames, members, 3) with the member locations starting at frame 1
+    :param removed_clusters: number of objects that were removed in the simulation
+    :param masses: the masses of the members, only used by the "trajectory" fitness_mode
+    :return: a list with the objectives
+    """
+
+    if fitness_mode == "trajectory":
+        return trajectory_objectives(locations, removed_clusters, masses)
+
+    max_radius, max_height = demolition_metrics(locations[min(evaluation_frame, len(locations)) - 1])
+    return [float(max_radius), float(max_height), removed_clusters]
+
+
+def scalarize_objectives(objectives, **kwargs):
+    """
+    computes the weighted evaluation score of a demolition from its objectives, so a single multi objective run can be
+    scored with any weighting afterwards
+
+    :param objectives: the objectives as returned by demolition_objectives()
+    :param kwargs: the weights and maxima of score_demolition() or score_trajectory()
+    :return: the resulting evaluation between [0,1]
+    """
+
+    if len(objectives) == 3:
+        return float(score_demolition(*objectives, **kwargs))
+    return score_trajectory(*objectives, **kwargs)
+
+
+def evaluate_bake(bake, removed_clusters):
+    """
+    evaluates a recorded bake with the fitness of fitness_mode
+
+    :param bake: an array of shape (frames, members, 4, 4) starting at frame 1
+    :param removed_clusters: number of objects that were removed in the simulation
+    :return: the resulting evaluation between [0,1], or the objectives in multi objective mode
+    """
+
+    locations = bake[:, :, :3, 3].astype(np.float64)
+    if multi_objective:
+        return demolition_objectives(locations, removed_clusters)
+    if fitness_mode == "trajectory":
+        return evaluate_trajectory(locations, removed_clusters)
+
+    max_radius, max_height = demolition_metrics(locations[min(evaluation_frame, len(locations)) - 1])
+    return float(score_demolition(max_radius, max_height, removed_clusters))
+
+
+def add_physics_all_object(breaking_threshold):
+    """
+    set the appropriate physics properties to each object in the scene in a single pass over the scene, through the
+    data api. All objects are linked into the rigid body world first, so a single update creates the settings of the
+    ones that never had them, see link_physics_objects().
+
+    :param breaking_threshold: The threshold to which the hinges should break
+    """
+
+    global physics_added, pristine_physics_state, pristine_scene_snapshot, armed_physics_params
+    # the materials and hinges are added to the separate members
+    remove_compound_bodies()
+    object_materials = {}
+    for obj in bpy.context.scene.objects:
+        for m_key in materials:
+            if obj.name.startswith(m_key):
+                object_materials[obj.name] = materials[m_key]
+                break
+    link_physics_objects(object_materials, hinge_set)
+
+    for object_name, mat in object_materials.items():
+        add_material_properties(object_name, mat)
+
+    # the pairs only depend on the model, so they are computed the first time the hinges are armed
+    if not hinge_pairs:
+        init_hinge_pairs()
+
+    for hinge_name in hinge_set:
+        add_hinge_properties(hinge_name, breaking_threshold)
+
+    if compound_bodies:
+        add_compound_bodies()
+
+    physics_added = True
+    removed_hinges.clear()
+    pristine_physics_state = capture_physics_state()
+    pristine_scene_snapshot = capture_scene_snapshot()
+    armed_physics_params = get_physics_params(breaking_threshold)
+
+
+def find_compound_groups():
+    """
+    groups the members that are held together by hinges that are no candidates for removal, without changing the
+    scene, and stores the candidate hinges inside a group in merged_candidates, because removing them changes nothing
+
+    :return: the members, the member pair of every hinge, which hinges connect two members, the group of every member
+    and which hinges are inside a group
+    """
+
+    if not hinge_pairs:
+        init_hinge_pairs()
+
+    members = get_member_objects()
+    member_idx = {obj.name: idx for idx, obj in enumerate(members)}
+    merged_candidates.clear()
+    candidate = np.zeros(len(hinge_set), dtype=bool)
+    candidate[get_candidate_hinges()] = True
+    pairs = np.array([[member_idx.get(name, -1) for name in hinge_pairs[hinge_name]] for hinge_name in hinge_set],
+                     dtype=np.int64).reshape((-1, 2))
+    valid = (pairs >= 0).all(axis=1)
+    # members that already have a parent are left alone, the compound object would replace it
+    parentless = np.array([obj.parent is None for obj in members] + [False])
+    rigid = valid & ~candidate & parentless[pairs[:, 0]] & parentless[pairs[:, 1]]
+    labels = connected_components(len(members), pairs[rigid, 0], pairs[rigid, 1])
+    internal = np.zeros(len(hinge_set), dtype=bool)
+    internal[valid] = labels[pairs[valid, 0]] == labels[pairs[valid, 1]]
+
+    merged_candidates.extend(int(idx) for idx in np.flatnonzero(internal & candidate))
+    if merged_candidates:
+        print(f"compound bodies: {len(merged_candidates)} candidate hinges are inside a compound body and are no "
+              f"candidates anymore: {[hinge_set[idx] for idx in merged_candidates]}")
+    return members, pairs, valid, labels, internal
+
+
+def compound_bodies_supported():
+    """
+    :return: True if blender has the compound collision shape (2.91 or newer)
+    """
+
+    return "COMPOUND" in bpy.types.RigidBodyObject.bl_rna.properties["collision_shape"].enum_items.keys()
+
+
+def add_compound_bodies():
+    """
+    merges the groups of find_compound_groups() into compound rigid bodies at their center of mass, and connects the
+    hinges between groups to the compound objects, so the solver has far fewer bodies and constraints
+    """
+
+    if not compound_bodies_supported():
+        print("compound collision shapes need blender 2.91 or newer, the members are simulated separately")
+        return
+
+    members, pairs, valid, labels, internal = find_compound_groups()
+    masses = get_member_masses()
+    locations = get_member_locations()
+    groups = {}
+    for idx, label in enumerate(labels):
+        groups.setdefault(label, []).append(idx)
+
+    compounds = {}
+    for label, group in groups.items():
+        if len(group) < 2:
+            continue
+
+        mesh = bpy.data.meshes.new("compound")
+        obj = bpy.data.objects.new("compound", mesh)
+        weights = masses[group] if masses[group].sum() > 0 else np.ones(len(group))
+        obj.location = (locations[group] * weights[:, np.newaxis]).sum(axis=0) / weights.sum()
+        bpy.context.scene.collection.objects.link(obj)
+        compounds[label] = obj
+        compound_objects.append(obj.name)
+    bpy.context.view_layer.update()
+
+    link_physics_objects(compound_objects, [])
+
+    for label, obj in compounds.items():
+        heaviest = members[max(groups[label], key=lambda idx: masses[idx])]
+        for idx in groups[label]:
+            members[idx].parent = obj
+            members[idx].matrix_parent_inverse = obj.matrix_world.inverted()
+
+        obj.rigid_body.type = "ACTIVE"
+        obj.rigid_body.collision_shape = "COMPOUND"
+        obj.rigid_body.mass = float(masses[groups[label]].sum())
+        obj.rigid_body.friction = heaviest.rigid_body.friction
+        obj.rigid_body.restitution = heaviest.rigid_body.restitution
+        set_deactivation_properties(obj.rigid_body)
+
+    # the constraints must connect the bodies that are simulated, which are the compound objects
+    for idx, hinge_name in enumerate(hinge_set):
+        if not valid[idx] or (labels[pairs[idx, 0]] not in compounds and labels[pairs[idx, 1]] not in compounds):
+            continue
+
+        constraint = bpy.context.scene.objects[hinge_name].rigid_body_constraint
+        if internal[idx]:
+            constraint.enabled = False
+        else:
+            constraint.object1 = compounds.get(labels[pairs[idx, 0]], members[pairs[idx, 0]])
+            constraint.object2 = compounds.get(labels[pairs[idx, 1]], members[pairs[idx, 1]])
+        compound_hinges.append(hinge_name)
+
+    print(f"compound bodies: {len(members)} members merged into {len(groups)} bodies, "
+          f"{int((valid & ~internal).sum())} of {int(valid.sum())} constraints left")
+
+
+def remove_compound_bodies():
+    """
+    undoes add_compound_bodies(): the members are unparented at their current place, the compound objects are
+    deleted and the constraints of the merged hinges are connected to the members again
+    """
+
+    objects = bpy.context.scene.objects
+    for name in compound_objects:
+        obj = bpy.data.objects.get(name)
+        if obj is None:
+            continue
+        for child in obj.children:
+            matrix = child.matrix_world.copy()
+            child.parent = None
+            child.matrix_world = matrix
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+    for hinge_name in compound_hinges:
+        constraint = objects[hinge_name].rigid_body_constraint
+        if constraint is not None:
+            constraint.enabled = True
+            constraint.object1, constraint.object2 = get_hinge_pair(objects[hinge_name])
+
+    compound_objects.clear()
+    compound_hinges.clear()
+    merged_candidates.clear()
+
+
+def get_physics_params(breaking_threshold):
+    """
+    get the settings that add_physics_all_object() depends on
+
+    :param breaking_threshold: The threshold to which the hinges should break
+    :return: a tuple of the settings
+    """
+
+    return (breaking_threshold, collision_shape_override, collision_filtering, deactivation_mode, compound_bodies,
+            candidate_max_height)
+
+
+def ensure_physics_added(mytool):
+    """
+    adds the physics to all objects when they are missing or were added with different settings
+    """
+
+    if not physics_added or armed_physics_params != get_physics_params(mytool.dem_threshold_float):
+        bpy.context.scene.frame_set(frame=0)
+        add_physics_all_object(mytool.dem_threshold_float)
+
+
+def remove_physics_all_object():
+    """
+    removes the physics of all objects
+    """
+
+    global physics_added, pristine_physics_state, pristine_scene_snapshot
+    remove_compound_bodies()
+    for obj in bpy.context.scene.objects:
+        for m_key in materials:
+            if obj.name.startswith(m_key):
+                remove_material_properties(obj.name)
+                break
+
+    for hinge_name in hinge_set:
+        remove_hinge_properties(hinge_name)
+
+    physics_added = False
+    removed_hinges.clear()
+    pristine_physics_state = None
+    pristine_scene_snapshot = None
+
+
+def get_rigidbody_world():
+    """
+    get the rigid body world of the scene. The world, its object collection and its constraint collection are
+    created when they do not exist yet.
+
+    :return: the rigid body world
+    """
+
+    scene = bpy.context.scene
+    if scene.rigidbody_world is None:
+        bpy.ops.rigidbody.world_add()
+
+    rigidbody_world = scene.rigidbody_world
+    if rigidbody_world.collection is None:
+        rigidbody_world.collection = bpy.data.collections.new("RigidBodyWorld")
+    if rigidbody_world.constraints is None:
+        rigidbody_world.constraints = bpy.data.collections.new("RigidBodyConstraints")
+
+    return rigidbody_world
+
+
+def link_physics_objects(object_names, hinge_names):
+    """
+    links objects into the collection of the rigid body world and hinges into its constraint collection. Blender only
+    creates the rigid body (and constraint) settings of a newly linked object on the next update of the simulation,
+    so that update is triggered once for all of them instead of an operator call per object.
+
+    :param object_names: the names of the objects that get rigid body settings
+    :param hinge_names: the names of the hinges that get constraint settings
+    """
+
+    scene = bpy.context.scene
+    rigidbody_world = get_rigidbody_world()
+    objects = [scene.objects[name] for name in object_names]
+    hinges = [scene.objects[name] for name in hinge_names]
+
+    for obj in objects:
+        if obj.name not in rigidbody_world.collection.objects:
+            rigidbody_world.collection.objects.link(obj)
+    for obj in hinges:
+        if obj.name not in rigidbody_world.constraints.objects:
+            rigidbody_world.constraints.objects.link(obj)
+
+    if any(obj.rigid_body is None for obj in objects) or any(obj.rigid_body_constraint is None for obj in hinges):
+        scene.frame_set(rigidbody_world.point_cache.frame_start)
+
+
+def calc_mesh_volume(obj):
+    """
+    computes the volume of the mesh of an object, including the scale of the object
+
+    :param obj: the object to compute the volume of
+    :return: the volume of the mesh
+    """
+
+    mesh = obj.data
+    mesh.calc_loop_triangles()
+
+    vertices = np.zeros(len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get("co", vertices)
+    vertices = vertices.reshape((-1, 3)) * np.array(obj.scale)
+
+    triangles = np.zeros(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", triangles)
+    triangles = vertices[triangles.reshape((-1, 3))]
+
+    # sum of the signed volumes of the tetrahedrons between the origin and every triangle
+    return abs(np.einsum("ij,ij->i", triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])).sum()) / 6
+
+
+def calc_shape_volume(obj, collision_shape):
+    """
+    computes the volume of the collision shape of an object the same way blender's 'Calculate Mass' does
+
+    :param obj: the object to compute the volume of
+    :param collision_shape: the rigid body collision shape of the object
+    :return: the volume of the collision shape
+    """
+
+    size_x, size_y, size_z = obj.dimensions
+    radius = max(size_x, size_y) / 2
+
+    if collision_shape == "BOX":
+        return size_x * size_y * size_z
+    if collision_shape == "SPHERE":
+        return 4 / 3 * np.pi * (max(size_x, size_y, size_z) / 2) ** 3
+    if collision_shape == "CAPSULE":
+        return np.pi * radius ** 2 * (size_z - 2 * radius) + 4 / 3 * np.pi * radius ** 3
+    if collision_shape == "CYLINDER":
+        return np.pi * radius ** 2 * size_z
+    if collision_shape == "CONE":
+        return np.pi * radius ** 2 * size_z / 3
+    return calc_mesh_volume(obj)
+
+
+def fit_collision_shape(obj):
+    """
+    picks the cheapest collision shape that fits the mesh of an object. The primitives are tried from cheap to
+    expensive. Blender sizes every primitive to the dimensions of the object and centres it on the origin of the
+    object, with the axis of a capsule or cylinder along the local z axis. So a primitive only fits when the bounding
+    box of the mesh is centred on the origin, when its extents have the proportions of the primitive (equal for a
+    sphere, equal in x and y for a capsule or cylinder) and when its volume (see calc_shape_volume()) is within
+    shape_fit_tolerance of the volume of the mesh. Objects that no primitive fits get their convex hull. The shapes are
+    cached per object until init_hinge_set() runs again, because the meshes never change.
+
+    :param obj: the object to fit a shape to
+    :return: the collision shape
+    """
+
+    if obj.name not in fitted_shapes:
+        corners = np.array([corner[:] for corner in obj.bound_box]) * np.array(obj.scale)
+        size = corners.max(axis=0) - corners.min(axis=0)
+        centre = (corners.max(axis=0) + corners.min(axis=0)) / 2
+        fits = {"SPHERE": size.min() >= (1 - shape_fit_tolerance) * size.max(),
+                "BOX": True,
+                "CAPSULE": min(size[:2]) >= (1 - shape_fit_tolerance) * max(size[:2]) and size[2] >= max(size[:2]),
+                "CYLINDER": min(size[:2]) >= (1 - shape_fit_tolerance) * max(size[:2])}
+
+        mesh_volume = calc_mesh_volume(obj)
+        fitted_shapes[obj.name] = "CONVEX_HULL"
+        # a primitive around the origin of an object whose origin is at one end would stick out on the other side
+        if (np.abs(centre) <= shape_fit_tolerance * size / 2 + 1e-6).all():
+            for collision_shape in ["SPHERE", "BOX", "CAPSULE", "CYLINDER"]:
+                if fits[collision_shape] and abs(calc_shape_volume(obj, collision_shape) - mesh_volume) <= \
+                        shape_fit_tolerance * mesh_volume:
+                    fitted_shapes[obj.name] = collision_shape
+                    break
+    return fitted_shapes[obj.name]
+
+
+def get_collision_shape(obj, mat):
+    """
+    get the collision shape of an object: the one of its material, or collision_shape_override for active objects
+
+    :param obj: the object
+    :param mat: the material of the object
+    :return: the collision shape
+    """
+
+    active = (mat["type"] or "ACTIVE") == "ACTIVE"
+    if active and collision_shape_override == "AUTO":
+        return fit_collision_shape(obj)
+    if active and collision_shape_override is not None:
+        return collision_shape_override
+    return mat.get("collision_shape", "CONVEX_HULL")
+
+
+def add_material_properties(object_name, mat):
+    """
+    adds the appropriate physics properties to an object with name object_name according to its material,
+    which is specified in the name itself. If an object starts with the name 'metal' we will give it metal properties.
+
+    :param object_name: The name of the object to apply physics properties to.
+    :param mat: the material to apply to the object
+    """
+
+    obj = bpy.context.scene.objects[object_name]
+    link_physics_objects([object_name], [])
+
+    obj.rigid_body.type = mat["type"] if mat["type"] else "ACTIVE"
+    obj.rigid_body.collision_shape = get_collision_shape(obj, mat)
+
+    if "Collision" not in obj.modifiers:
+        obj.modifiers.new(name="Collision", type='COLLISION')
+
+    if "density" in mat:
+        obj.rigid_body.mass = calc_shape_volume(obj, obj.rigid_body.collision_shape) * mat["density"]
+
+    if "friction" in mat:
+        obj.rigid_body.friction = mat["friction"]
+
+    if "restitution" in mat:
+        obj.rigid_body.restitution = mat["restitution"]
+
+    if obj.rigid_body.type == "ACTIVE":
+        set_deactivation_properties(obj.rigid_body)
+
+
+def set_deactivation_properties(rigid_body):
+    """
+    sets the sleeping settings of an active rigid body according to deactivation_mode. Every body starts awake, see
+    update_start_deactivated().
+
+    :param rigid_body: the rigid body settings of the object (obj.rigid_body)
+    """
+
+    rigid_body.use_deactivation = deactivation_mode != "off"
+    rigid_body.deactivate_linear_velocity = deactivation_linear_velocity
+    rigid_body.deactivate_angular_velocity = deactivation_angular_velocity
+    rigid_body.use_start_deactivated = False
+
+
+def add_hinge_properties(object_name, breaking_threshold):
+    """
+    add physics properties to the given hinge
+
+    :param object_name: the hinge object
+    :param breaking_threshold: the breaking threshold of the hinge
+    """
+
+    obj = bpy.context.scene.objects[object_name]
+    link_physics_objects([], [object_name])
+
+    constraint = obj.rigid_body_constraint
+    constraint.type = 'HINGE'
+    constraint.enabled = True
+    # the members of a hinge touch at their ends, testing them for collisions is wasted as long as they are joined.
+    # bullet only filters the pairs of enabled constraints, so removed and broken hinges collide again
+    constraint.disable_collisions = collision_filtering
+    constraint.use_breaking = True
+    constraint.object1, next_paired_obj = get_hinge_pair(obj)
+    if next_paired_obj is not None:
+        constraint.object2 = next_paired_obj
+    constraint.breaking_threshold = breaking_threshold
+
+
+def remove_material_properties(object_name):
+    """
+    remove the physics properties of an object
+
+    :param object_name: name of the object
+    :return:
+    """
+    obj = bpy.context.scene.objects[object_name]
+    rigidbody_world = get_rigidbody_world()
+
+    if obj.name in rigidbody_world.collection.objects:
+        rigidbody_world.collection.objects.unlink(obj)
+    if "Collision" in obj.modifiers:
+        obj.modifiers.remove(obj.modifiers["Collision"])
+
+
+def remove_hinge_properties(object_name):
+    """
+    remove the physics properties of a hinge
+
+    :param object_name: name of the hinge
+    :return:
+    """
+    obj = bpy.context.scene.objects[object_name]
+    rigidbody_world = get_rigidbody_world()
+
+    if obj.name in rigidbody_world.constraints.objects:
+        rigidbody_world.constraints.objects.unlink(obj)
+
+
+def random_chromosome():
+    """
+    Generates a random chromosome based on some global parameters. A chromosome
+    contains a number of hinge clusters(genes) that are removed from the
+    standard model.
+
+    :param max_chromosome_size: the maximum number of hinge clusters that are removed
+    :param accept_new_block: a threshold for which random block are accepted
+    :return: a chromosome, an array with the bitset of every hinge cluster, see empty_chromosome().
+    """
+    clusters = []
+    removed = hinge_mask([])
+    candidates = get_candidate_hinges()
+    for idx in range(0, max_chromosome_size):
+        if random() < accept_new_block:
+            available = np.setdiff1d(candidates, mask_hinges(removed))
+            if len(available) > 0:
+                cluster = get_hinge_cluster(int(available[randint(0, len(available) - 1)]))
+                clusters.append(cluster)
+                removed |= cluster
+
+    chromosome = np.array(clusters, dtype=np.uint8).reshape((-1, len(removed)))
+    print(chromosome_to_lists(chromosome))
+    return chromosome
+
+
+def crossover(parent1, parent2):
+    """
+    Generates a new chromosome based on the 2 parent chromosomes. It randomly
+    selects genes from the first or second parents and puts these together in
+    the new chromosome
+
+    :param parent1: first parent used in the crossover
+    :param parent2: second parent used in the crossover
+    :return: a new chromosome base on parent1 and parent2
+    """
+    genes = []
+    max_size = max(len(parent1), len(parent2))
+    for idx in range(0, max_size):
+        if random() < 0.5:
+            if idx < len(parent1):
+                genes.append(parent1[idx])
+        else:
+            if idx < len(parent2):
+                genes.append(parent2[idx])
+    return np.array(genes, dtype=np.uint8).reshape((-1, parent1.shape[1]))
+
+
+def random_mutations(chromosome):
+    """
+    Randomly mutates the input chromosome. By replacing a gene based on the
+    global parameter mutation_rate.
+
+    :param chromosome: chromosome that is mutated
+    :return: a new mutated chromosome based
+    """
+    new_chromosome = chromosome.copy()
+    removed = removed_hinge_mask(chromosome)
+    candidates = get_candidate_hinges()
+    for idx in range(0, len(chromosome)):
+        if random() < mutation_rate:
+            # with few candidates all of them can be removed already, then the gene stays the same
+            available = np.setdiff1d(candidates, mask_hinges(removed))
+            if len(available) > 0:
+                new_chromosome[idx] = get_hinge_cluster(int(available[randint(0, len(available) - 1)]))
+                removed |= new_chromosome[idx]
+    return new_chromosome
+
+
+def init_chromosomes():
+    """
+    creates a pool of random chromosomes and saves them in the global parameter
+    chromosomes_idxs
+    """
+
+    for chromosome_idx in range(0, chromosome_pool_size):
+        chromosomes_idxs[chromosome_idx] = random_chromosome()
+
+
+def mutate_chromosomes():
+    """
+    This function will mutate the current pool of chromosomes. It has 4
+    different mutation strategies that all come up with an equal number of new
+    chromosomes.
+    1. Take the two best chromosomes in the pool and create children using the
+    crossover function.
+    2. Take the two best chromosomes in the pool and create children using the
+    crossover function but also perform random mutations on these children.
+    3. Create new random chromosomes
+    4. Use the two best chromosomes in the pool and mutate those.
+
+    The new chromosomes are saved in the global variable chromosomes_idxs.
+    """
+    global chromosomes_idxs
+    score_dict = {}
+    for idx in range(0, len(chromosome_fitness)):
+        score_dict[idx] = chromosome_fitness[idx]
+
+    sorted_dict = sorted(score_dict.items(), key=lambda item: item[1], reverse=True)
+    parent1 = chromosomes_idxs[sorted_dict[0][0]]
+    parent2 = chromosomes_idxs[sorted_dict[1][0]]
+
+    new_chromosomes = []
+    for x in range(0, chromosome_pool_size // 2):
+        new_chromosome = crossover(parent1, parent2)
+        if x % 2:
+            new_chromosome = random_mutations(new_chromosome)
+        new_chromosomes.append(new_chromosome)
+
+    for x in range(0, chromosome_pool_size // 4):
+        new_chromosomes.append(random_chromosome())
+
+    for x in range(0, chromosome_pool_size // 4):
+        if x % 2:
+            new_chromosomes.append(random_mutations(parent1))
+        else:
+            new_chromosomes.append(random_mutations(parent2))
+
+    chromosomes_idxs = new_chromosomes
+
+
+def remove_physics_hinge(hinge_idxs):
+    """
+    removes hinges from the simulation by disabling their constraint, which is much cheaper than deleting it
+
+    :param hinge_idxs: indexes of the hinges in hinge_set
+    """
+
+    for i in hinge_idxs:
+        if i not in removed_hinges:
+            bpy.context.scene.objects[hinge_set[i]].rigid_body_constraint.enabled = False
+            removed_hinges.add(i)
+    update_start_deactivated()
+
+
+def add_physics_hinge(hinge_idxs, my_tool):
+    """
+    enables the constraints of hinges that were removed by remove_physics_hinge() again
+
+    :param hinge_idxs: indexes of the hinges in hinge_set
+    """
+
+    for i in hinge_idxs:
+        if i in removed_hinges:
+            constraint = bpy.context.scene.objects[hinge_set[i]].rigid_body_constraint
+            constraint.enabled = True
+            constraint.breaking_threshold = my_tool.dem_threshold_float
+            removed_hinges.discard(i)
+    update_start_deactivated()
+
+
+def update_start_deactivated():
+    """
+    starts the bodies further than deactivation_distance from every removed hinge asleep when deactivation_mode is
+    "far", and all bodies awake otherwise. The bodies are the members and the compound objects of
+    add_compound_bodies(), the members inside a compound object are simulated as part of it. Bullet wakes a sleeping
+    body as soon as an awake body hits it or any body in its constraint island moves, so on a tower that is held
+    together by hinges this only keeps the parts asleep that are not connected to the removed hinges. Only the bodies
+    whose setting changes are written.
+    """
+
+    # add_material_properties() wakes every member when the physics is re-armed for another mode
+    if deactivation_mode != "far":
+        return
+
+    objects = bpy.context.scene.objects
+    compounds = [objects[name] for name in compound_objects if name in objects]
+    bodies = [objects[int(idx)] for idx in get_member_idxs()] + compounds
+    if removed_hinges:
+        locations = np.concatenate([get_member_locations(),
+                                    np.array([obj.matrix_world.translation for obj in compounds]).reshape((-1, 3))])
+        removed_positions = hinge_positions[sorted(removed_hinges)]
+        distances = np.linalg.norm(locations[:, np.newaxis] - removed_positions[np.newaxis], axis=2)
+        far = distances.min(axis=1) > deactivation_distance
+    else:
+        far = np.zeros(len(bodies), dtype=bool)
+
+    for obj, start_deactivated in zip(bodies, far):
+        rigid_body = obj.rigid_body
+        if obj.parent is not None and obj.parent.name in compound_objects:
+            continue
+        if rigid_body is not None and rigid_body.type == "ACTIVE" and \
+                rigid_body.use_start_deactivated != bool(start_deactivated):
+            rigid_body.use_start_deactivated = bool(start_deactivated)
+
+
+def capture_scene_snapshot():
+    """
+    captures the transforms of all objects and the enabled flags of all hinge constraints. Blender starts every
+    simulation at rest, so there are no velocities to capture.
+
+    :return: a dictionary of arrays
+    """
+
+    objects = bpy.context.scene.objects
+    snapshot = {}
+    for attribute, size in [("location", 3), ("rotation_euler", 3), ("rotation_quaternion", 4), ("scale", 3)]:
+        snapshot[attribute] = np.zeros(len(objects) * size, dtype=np.float32)
+        objects.foreach_get(attribute, snapshot[attribute])
+
+    snapshot["enabled"] = np.array([objects[hinge_name].rigid_body_constraint.enabled for hinge_name in hinge_set],
+                                   dtype=bool)
+    return snapshot
+
+
+def restore_scene_snapshot(snapshot):
+    """
+    restores the transforms and hinge constraints of a snapshot in bulk. Only the transforms that changed are written
+    and only the constraints of removed hinges are toggled, so this is almost free when nothing drifted.
+
+    :param snapshot: the snapshot as returned by capture_scene_snapshot()
+    """
+
+    objects = bpy.context.scene.objects
+    for attribute in ["location", "rotation_euler", "rotation_quaternion", "scale"]:
+        values = np.zeros(len(snapshot[attribute]), dtype=np.float32)
+        objects.foreach_get(attribute, values)
+        if not np.array_equal(values, snapshot[attribute]):
+            objects.foreach_set(attribute, snapshot[attribute])
+            bpy.context.view_layer.update()
+
+    for i in removed_hinges:
+        objects[hinge_set[i]].rigid_body_constraint.enabled = bool(snapshot["enabled"][i])
+    if removed_hinges:
+        removed_hinges.clear()
+        update_start_deactivated()
+
+
+def capture_physics_state():
+    """
+    captures the physics settings of all objects in the scene, so we can check that the removed hinges are restored
+    properly.
+
+    :return: a dictionary from object name to a tuple of its physics settings
+    """
+
+    rigidbody_world = get_rigidbody_world()
+    state = {}
+    for obj in rigidbody_world.collection.objects:
+        state[obj.name] = (obj.rigid_body.type, obj.rigid_body.collision_shape, obj.rigid_body.mass,
+                           obj.rigid_body.friction, obj.rigid_body.restitution)
+    for obj in rigidbody_world.constraints.objects:
+        constraint = obj.rigid_body_constraint
+        state[obj.name] = (constraint.type, constraint.enabled, constraint.disable_collisions,
+                           constraint.use_breaking, constraint.breaking_threshold,
+                           constraint.object1.name if constraint.object1 else None,
+                           constraint.object2.name if constraint.object2 else None)
+    return state
+
+
+def physics_state_matches():
+    """
+    compares the physics of the scene to the state captured right after add_physics_all_object()
+
+    :return: True if the scene has the same physics as after add_physics_all_object()
+    """
+
+    if pristine_physics_state is None:
+        return False
+
+    state = capture_physics_state()
+    for name in pristine_physics_state.keys() ^ state.keys():
+        print(f"physics of {name} was not restored")
+    for name in pristine_physics_state.keys() & state.keys():
+        if pristine_physics_state[name] != state[name]:
+            print(f"physics of {name} differs: {state[name]} != {pristine_physics_state[name]}")
+
+    return pristine_physics_state == state
+
+
+def export_scene_description(path=None):
+    """
+    reads the structure of the scene into a description that does not depend on blender: the meshes, collision shapes,
+    masses and frictions of all objects with a material, and the pivot, axis and object pair of every hinge. The
+    collision shapes and masses are the ones add_material_properties() gives the objects. Hinges that are not
+    connected to two objects with a material are left out, because the backend has no body for them.
+
+    :param path: optional json file the description is written to
+    :return: the scene description
+    """
+
+    scene = bpy.context.scene
+    if not hinge_pairs:
+        init_hinge_pairs()
+
+    bodies = []
+    for obj in scene.objects:
+        for m_key in materials:
+            if not obj.name.startswith(m_key):
+                continue
+
+            mat = materials[m_key]
+            location, rotation, scale = obj.matrix_world.decompose()
+            vertices = np.zeros(len(obj.data.vertices) * 3)
+            obj.data.vertices.foreach_get("co", vertices)
+            vertices = vertices.reshape((-1, 3)) * np.array(scale)
+            collision_shape = get_collision_shape(obj, mat)
+
+            bodies.append({"name": obj.name,
+                           "type": mat["type"] or "ACTIVE",
+                           "mass": calc_shape_volume(obj, collision_shape) * mat.get("density", 0),
+                           "friction": mat.get("friction", 0.5),
+                           "restitution": mat.get("restitution", 0),
+                           "collision_shape": collision_shape,
+                           "dimensions": list(obj.dimensions),
+                           "position": list(location),
+                           "orientation": [rotation.x, rotation.y, rotation.z, rotation.w],
+                           "vertices": vertices.tolist()})
+            break
+
+    body_names = {body["name"] for body in bodies}
+    hinges = []
+    skipped_hinges = []
+    for hinge_name in hinge_set:
+        hinge = scene.objects[hinge_name]
+        object1, object2 = hinge_pairs.get(hinge_name, (None, None))
+        if object1 not in body_names or object2 not in body_names:
+            skipped_hinges.append(hinge_name)
+            continue
+        hinges.append({"name": hinge_name,
+                       "object1": object1,
+                       "object2": object2,
+                       "pivot": list(hinge.matrix_world.translation),
+                       # a blender hinge rotates around the local z axis of the constraint object
+                       "axis": list((hinge.matrix_world.to_3x3() @ Vector((0, 0, 1))).normalized())})
+
+    if skipped_hinges:
+        print(f"{len(skipped_hinges)} hinges are not connected to two objects with a material and are left out: "
+              f"{skipped_hinges}")
+
+    description = {"fps": scene.render.fps / scene.render.fps_base,
+                   "collision_shape_override": collision_shape_override,
+                   "gravity": list(scene.gravity) if scene.use_gravity else [0, 0, 0],
+                   "bodies": bodies,
+                   "members": [obj.name for obj in get_member_objects()],
+                   "hinges": hinges}
+
+    if path is not None:
+        with open(bpy.path.abspath(path), "w") as file:
+            json.dump(description, file)
+
+    return description
+
+
+def evaluate_chromosome_bullet(chromosome, context):
+    """
+    Runs the simulation of a single chromosome with the bullet backend instead of blender and evaluates it.
+
+    :param chromosome: the chromosome that is evaluated.
+    :return : The fitness score of the chromosome
+    """
+
+    global bullet_scene
+    add_script_dir_to_path()
+    import bullet_backend
+
+    # the collision shapes and masses of the description depend on collision_shape_override
+    if bullet_scene is None or bullet_scene["collision_shape_override"] != collision_shape_override:
+        bullet_scene = export_scene_description()
+
+    removed_hinge_names = [hinge_set[idx] for idx in chromosome_hinges(chromosome)]
+    if fitness_mode == "trajectory":
+        trajectory = bullet_backend.simulate(bullet_scene, removed_hinge_names, get_sim_params(context.scene.my_tool),
+                                             range(1, evaluation_frame + 1))
+        masses = {body["name"]: body["mass"] for body in bullet_scene["bodies"]}
+        masses = np.array([masses[name] for name in bullet_scene["members"]])
+        if multi_objective:
+            return trajectory_objectives(trajectory, len(chromosome), masses)
+        return evaluate_trajectory(trajectory, len(chromosome), masses)
+
+    locations = bullet_backend.simulate(bullet_scene, removed_hinge_names, get_sim_params(context.scene.my_tool),
+                                        [evaluation_frame])
+    if multi_objective:
+        return demolition_objectives(locations, len(chromosome))
+    max_radius, max_height = demolition_metrics(locations[-1])
+    print(f"r{max_radius}")
+    print(f"h {max_height}")
+    print(f"d {len(chromosome)}")
+
+    return float(score_demolition(max_radius, max_height, len(chromosome)))
+
+
+def evaluate_chromosome(chromosome, context):
+    """
+    Runs the simulations of a single chromosome and evaluates it.
+
+    :param chromosome: the chromosome that is evaluated.
+    :return : The fitness score of the chromosome, or its objectives in multi objective mode
+    """
+    if physics_backend == "bullet":
+        return evaluate_chromosome_bullet(chromosome, context)
+
+    scene = context.scene
+    chromosome_1d = chromosome_hinges(chromosome)
+
+    bake_key = bake_cache_key(chromosome_1d, get_sim_params(scene.my_tool)) if bake_cache_dir else None
+    bake = load_cached_bake(bake_key, get_bake_horizon()) if bake_key else None
+    if bake is not None:
+        with timed_stage("evaluation"):
+            return evaluate_bake(bake, len(chromosome))
+
+    with timed_stage("teardown"):
+        bpy.context.scene.frame_set(frame=0)
+    with timed_stage("removal"):
+        remove_physics_hinge(chromosome_1d)
+    if stepped_bake or fitness_mode == "trajectory":
+        # the member matrices are recorded while the frames are simulated, so the trajectory costs no extra pass
+        bake = calc_physics_stepped(scene.my_tool, evaluation_frame, early_stop=stepped_bake)
+        with timed_stage("evaluation"):
+            if bake_key:
+                store_cached_bake(bake_key, bake)
+            score = evaluate_bake(bake, len(chromosome))
+    elif bake_key:
+        calc_physics(scene.my_tool, evaluation_frame)
+        with timed_stage("evaluation"):
+            bake = record_bake(evaluation_frame)
+            store_cached_bake(bake_key, bake)
+            score = evaluate_bake(bake, len(chromosome))
+    else:
+        calc_physics(scene.my_tool, evaluation_frame)
+        with timed_stage("evaluation"):
+            bpy.context.scene.frame_set(frame=evaluation_frame)
+            if multi_objective:
+                score = demolition_objectives(get_member_locations()[np.newaxis], len(chromosome))
+            else:
+                score = evaluate_demolition(len(chromosome))
+
+    with timed_stage("rearm"):
+        bpy.context.scene.frame_set(frame=0)
+        restore_scene_snapshot(pristine_scene_snapshot)
+        if check_physics_state and not physics_state_matches():
+            add_physics_all_object(scene.my_tool.dem_threshold_float)
+
+    return score
+
+
+def profile_call(function, *args):
+    """
+    calls a function with the profiler of the profiler setting running
+
+    :return: the result of the function
+    """
+
+    global evaluation_profiler
+    if profiler is None:
+        return function(*args)
+
+    if evaluation_profiler is None:
+        if profiler == "pyinstrument":
+            from pyinstrument import Profiler
+            evaluation_profiler = Profiler()
+        else:
+            evaluation_profiler = cProfile.Profile()
+
+    if profiler == "pyinstrument":
+        evaluation_profiler.start()
+        try:
+            return function(*args)
+        finally:
+            evaluation_profiler.stop()
+
+    return evaluation_profiler.runcall(function, *args)
+
+
+def write_profile(path, summary=True):
+    """
+    writes the statistics of the evaluation profiler to a file and prints the most expensive functions
+
+    :param path: the file the statistics are written to
+    :param summary: print the most expensive functions, a worker process must not print to its stdout
+    """
+
+    if evaluation_profiler is None:
+        return
+
+    if profiler == "pyinstrument":
+        with open(path, "w") as file:
+            file.write(evaluation_profiler.output_text())
+        if summary:
+            print(evaluation_profiler.output_text())
+    else:
+        stats = pstats.Stats(evaluation_profiler)
+        stats.dump_stats(path)
+        if summary:
+            stats.sort_stats("cumulative").print_stats(20)
+            print(f"profile written to {path}")
+
+
+def evaluate_chromosome_timed(chromosome, context):
+    """
+    evaluates a chromosome with evaluate_chromosome() and measures the time of every stage
+
+    :param chromosome: the chromosome that is evaluated.
+    :return: the fitness score of the chromosome and a dictionary with the time of every stage
+    """
+
+    stage_timings.clear()
+    start_time = time.perf_counter()
+    score = profile_call(evaluate_chromosome, chromosome, context)
+
+    timings = dict(stage_timings)
+    timings["total"] = time.perf_counter() - start_time
+    return score, timings
+
+
+def write_timing_log(record):
+    """
+    appends a record to the timing log
+
+    :param record: a dictionary with the fields of the record
+    """
+
+    if timing_log_path is None:
+        return
+
+    path = bpy.path.abspath(timing_log_path)
+    if path.endswith(".csv"):
+        fields = ["type", "generation", "clusters", "hinges", "score"] + timing_stages + ["total", "wall"]
+        new_file = not os.path.isfile(path)
+        with open(path, "a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fields, extrasaction="ignore")
+            if new_file:
+                writer.writeheader()
+            writer.writerow(record)
+    else:
+        with open(path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+
+
+def log_chromosome_timings(chromosome, score, timings):
+    """
+    writes the stage timings of an evaluated chromosome to the timing log and adds them to the generation totals
+
+    :param chromosome: the evaluated chromosome
+    :param score: the fitness score of the chromosome
+    :param timings: the timings as returned by evaluate_chromosome_timed()
+    """
+
+    with timing_lock:
+        for stage, duration in timings.items():
+            generation_timings[stage] = generation_timings.get(stage, 0) + duration
+
+        write_timing_log(dict(timings, type="chromosome", generation=generation, clusters=len(chromosome),
+                              hinges=len(chromosome_hinges(chromosome)), score=score))
+
+
+def log_generation_timings(wall_time):
+    """
+    writes the summed stage timings of the generation to the timing log and prints them
+
+    :param wall_time: the wall time of the whole generation
+    """
+
+    with timing_lock:
+        print("time per stage: " + ", ".join(f"{stage} {duration:.3f}s" for stage, duration in
+                                              generation_timings.items()) + f", wall {wall_time:.3f}s")
+        write_timing_log(dict(generation_timings, type="generation", generation=generation, wall=wall_time))
+        generation_timings.clear()
+
+
+def get_sim_params(mytool):
+    """
+    collects the simulation parameters of the UI sliders, so they can be send to a worker process
+
+    :param mytool: the scene properties (scene.my_tool)
+    :return: a dictionary with the simulation parameters
+    """
+
+    return {"threshold": mytool.dem_threshold_float,
+            "substeps": int(mytool.dem_substeps_float),
+            "solver_iterations": int(mytool.dem_solver_iter_float),
+            "speed": mytool.dem_speed_float,
+            "stepped_bake": stepped_bake,
+            "evaluation_frame": evaluation_frame,
+            "fitness": fitness_mode,
+            "multi_objective": multi_objective,
+            "collision_shape": collision_shape_override,
+            "collision_filtering": collision_filtering,
+            "deactivation": deactivation_mode,
+            "candidate_max_height": candidate_max_height,
+            "compound_bodies": compound_bodies,
+            "backend": physics_backend}
+
+
+def set_sim_params(mytool, params):
+    """
+    sets the UI sliders and settings to the given simulation parameters
+
+    :param mytool: the scene properties (scene.my_tool)
+    :param params: a dictionary as returned by get_sim_params()
+    """
+
+    global stepped_bake, evaluation_frame, fitness_mode, multi_objective, collision_shape_override, physics_backend
+    global candidate_max_height, compound_bodies, collision_filtering, deactivation_mode
+    mytool.dem_threshold_float = params["threshold"]
+    mytool.dem_substeps_float = params["substeps"]
+    mytool.dem_solver_iter_float = params["solver_iterations"]
+    mytool.dem_speed_float = params["speed"]
+    stepped_bake = params["stepped_bake"]
+    evaluation_frame = params["evaluation_frame"]
+    fitness_mode = params["fitness"]
+    multi_objective = params["multi_objective"]
+    collision_shape_override = params["collision_shape"]
+    collision_filtering = params["collision_filtering"]
+    deactivation_mode = params["deactivation"]
+    candidate_max_height = params["candidate_max_height"]
+    compound_bodies = params["compound_bodies"]
+    physics_backend = params["backend"]
+
+
+def get_script_path():
+    """
+    get the path of this script on disk. When the script is run from the blender text editor __file__ points
+    inside the .blend file, so we look up the file the text block was loaded from.
+
+    :return: the absolute path of this script
+    """
+
+    if os.path.isfile(__file__):
+        return os.path.abspath(__file__)
+
+    for text in bpy.data.texts:
+        if text.filepath and text.name == os.path.basename(__file__):
+            return bpy.path.abspath(text.filepath)
+
+    raise RuntimeError("cannot find main.py on disk, open it from a file in the text editor")
+
+
+def add_script_dir_to_path():
+    """
+    adds the directory of this script to sys.path, so the modules next to it can be imported. Blender does not add it
+    when it runs the script.
+    """
+
+    script_dir = os.path.dirname(get_script_path())
+    if script_dir not in sys.path:
+        sys.path.append(script_dir)
+
+
+def get_script_args():
+    """
+    get the command line arguments meant for this script, which are the arguments after '--'
+
+    :return: a list of arguments
+    """
+
+    if "--" not in sys.argv:
+        return []
+    return sys.argv[sys.argv.index("--") + 1:]
+
+
+def send_worker_message(message):
+    """
+    writes a message from a worker process back to the parent process
+
+    :param message: a json serializable object
+    """
+
+    print(worker_message_prefix + json.dumps(message), flush=True)
+
+
+def read_worker_message(worker):
+    """
+    reads the next message of a worker process, skipping all other output of the process
+
+    :param worker: the worker process
+    :return: the decoded message
+    """
+
+    for line in worker.stdout:
+        if line.startswith(worker_message_prefix):
+            return json.loads(line[len(worker_message_prefix):])
+
+    raise RuntimeError(f"worker process {worker.pid} exited with code {worker.wait()}")
+
+
+def start_worker_pool(pool_size):
+    """
+    launches pool_size background blender processes that each load the saved .blend file and run this script in
+    worker mode. Returns when all workers have initialized their physics.
+
+    :param pool_size: the number of worker processes
+    """
+
+    stop_worker_pool()
+    if not bpy.data.filepath:
+        raise RuntimeError("save the .blend file before starting the worker pool")
+
+    command = [bpy.app.binary_path, "-b", bpy.data.filepath, "--python", get_script_path(), "--", "--worker"]
+    if profiler is not None:
+        # every worker writes its own profile next to the profile of the parent process
+        command += ["--profile", profiler, "--profile-output", bpy.path.abspath(profile_path)]
+    if bake_cache_dir is not None:
+        # the workers store their bakes in the same cache, so they can be replayed in the user interface
+        command += ["--bake-cache", bpy.path.abspath(bake_cache_dir)]
+    for idx in range(0, pool_size):
+        worker_processes.append(subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                                 universal_newlines=True, bufsize=1))
+
+    for worker in worker_processes:
+        message = read_worker_message(worker)
+        # the hinge indexes of a chromosome are only valid if both processes see the same hinges
+        if message["hinges"] != len(hinge_set):
+            stop_worker_pool()
+            raise RuntimeError("the saved .blend file does not match the open scene, save it and try again")
+
+
+def stop_worker_pool():
+    """
+    stops all worker processes, a worker exits as soon as its stdin is closed
+    """
+
+    for worker in worker_processes:
+        if worker.poll() is None:
+            worker.stdin.close()
+    for worker in worker_processes:
+        worker.wait()
+    worker_processes.clear()
+
+
+atexit.register(stop_worker_pool)
+
+
+def request_worker_score(worker, chromosome, params):
+    """
+    lets a worker process evaluate a single chromosome
+
+    :param worker: the worker process
+    :param chromosome: the chromosome that is evaluated
+    :param params: the simulation parameters as returned by get_sim_params()
+    :return: the fitness score of the chromosome
+    """
+
+    worker.stdin.write(json.dumps({"chromosome": chromosome_to_lists(chromosome), "params": params}) + "\n")
+    worker.stdin.flush()
+    message = read_worker_message(worker)
+    log_chromosome_timings(chromosome, message["score"], message["timings"])
+    return message["score"]
+
+
+def evaluate_chromosomes_parallel(chromosomes, params):
+    """
+    evaluates a list of chromosomes on the worker pool. Every worker evaluates one chromosome at the time and
+    picks up the next one as soon as it is done.
+
+    :param chromosomes: the chromosomes that are evaluated
+    :param params: the simulation parameters as returned by get_sim_params()
+    :return: the fitness scores in the same order as chromosomes
+    """
+
+    if len(worker_processes) != worker_pool_size:
+        start_worker_pool(worker_pool_size)
+
+    idle_workers = queue.Queue()
+    for worker in worker_processes:
+        idle_workers.put(worker)
+
+    def evaluate(chromosome):
+        worker = idle_workers.get()
+        try:
+            return request_worker_score(worker, chromosome, params)
+        finally:
+            idle_workers.put(worker)
+
+    with ThreadPoolExecutor(max_workers=len(worker_processes)) as executor:
+        return list(executor.map(evaluate, chromosomes))
+
+
+def run_worker(context):
+    """
+    main loop of a worker process. Reads one chromosome per line from stdin, evaluates it and writes the score
+    back to stdout. The loop ends when the parent process closes stdin.
+    """
+
+    mytool = context.scene.my_tool
+    send_worker_message({"hinges": len(hinge_set)})
+
+    for line in sys.stdin:
+        job = json.loads(line)
+        set_sim_params(mytool, job["params"])
+        ensure_physics_added(mytool)
+
+        bpy.context.scene.frame_set(frame=0)
+        score, timings = evaluate_chromosome_timed(chromosome_from_lists(job["chromosome"]), context)
+        send_worker_message({"score": score, "timings": timings})
+
+    write_profile(f"{profile_path}.{os.getpid()}", summary=False)
+
+
+def chromosome_key(chromosome, params):
+    """
+    computes the key of a chromosome in the fitness cache. Chromosomes that remove the same hinges in the same number of
+    clusters with the same simulation parameters get the same score, so they share a key. The key also holds the hash
+    of the model (see get_model_hash()), because the scores in the sqlite file outlive the model they belong to.
+
+    :param chromosome: the chromosome
+    :param params: the simulation parameters as returned by get_sim_params()
+    :return: the key as a string
+    """
+
+    hinges = removed_hinge_mask(chromosome).tobytes().hex()
+    return json.dumps({"hinges": hinges, "clusters": len(chromosome), "params": params, "model": get_model_hash()},
+                      sort_keys=True)
+
+
+def open_fitness_cache_db():
+    """
+    opens the sqlite file of the fitness cache and creates its table when needed
+
+    :return: the database connection or None if the cache is not persisted
+    """
+
+    global fitness_cache_db
+    if fitness_cache_db is None and fitness_cache_path is not None:
+        fitness_cache_db = sqlite3.connect(bpy.path.abspath(fitness_cache_path))
+        fitness_cache_db.execute("CREATE TABLE IF NOT EXISTS fitness (key TEXT PRIMARY KEY, score REAL)")
+    return fitness_cache_db
+
+
+def get_cached_fitness(key):
+    """
+    looks up the score of a chromosome in memory and otherwise in the sqlite file
+
+    :param key: the key as returned by chromosome_key()
+    :return: the fitness score or None if the chromosome was never evaluated
+    """
+
+    if key in fitness_cache:
+        fitness_cache.move_to_end(key)
+        return fitness_cache[key]
+
+    db = open_fitness_cache_db()
+    if db is None:
+        return None
+
+    row = db.execute("SELECT score FROM fitness WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+
+    # the objectives of the multi objective mode are stored as json
+    score = json.loads(row[0]) if isinstance(row[0], str) else row[0]
+    store_cached_fitness(key, score, persist=False)
+    return score
+
+
+def store_cached_fitness(key, score, persist=True):
+    """
+    stores the score of a chromosome in the fitness cache
+
+    :param key: the key as returned by chromosome_key()
+    :param score: the fitness score of the chromosome, or its objectives in multi objective mode
+    :param persist: also write the score to the sqlite file
+    """
+
+    fitness_cache[key] = score
+    fitness_cache.move_to_end(key)
+    while len(fitness_cache) > fitness_cache_size:
+        fitness_cache.popitem(last=False)
+
+    db = open_fitness_cache_db()
+    if persist and db is not None:
+        with db:
+            db.execute("INSERT OR REPLACE INTO fitness (key, score) VALUES (?, ?)",
+                       (key, json.dumps(score) if isinstance(score, list) else score))
+
+
+def get_model_hash():
+    """
+    computes the hash of the structure once: the hinges, the names of the members and their transforms. Bakes and
+    checkpoints of another model, or of another version of it, are not reused. Saving the .blend file again does not
+    change the hash. The location, rotation and scale properties are hashed instead of the world matrices, because
+    they do not move during a simulation.
+
+    :return: the sha1 hash as a hex string
+    """
+
+    global model_hash
+    if model_hash is None:
+        objects = bpy.context.scene.objects
+        sha1 = hashlib.sha1()
+        sha1.update(json.dumps(hinge_set).encode())
+        sha1.update(json.dumps([obj.name for obj in get_member_objects()]).encode())
+        for attribute, size in [("location", 3), ("rotation_euler", 3), ("rotation_quaternion", 4), ("scale", 3)]:
+            values = np.zeros(len(objects) * size, dtype=np.float32)
+            objects.foreach_get(attribute, values)
+            sha1.update(values.reshape((-1, size))[get_member_idxs()].round(4).tobytes())
+        sha1.update(hinge_positions.round(4).tobytes())
+        model_hash = sha1.hexdigest()
+    return model_hash
+
+
+def bake_cache_key(hinge_idxs, params):
+    """
+    computes the key of a bake in the bake cache from the removed hinges, the simulation parameters and the model
+
+    :param hinge_idxs: indexes of the removed hinges
+    :param params: the simulation parameters as returned by get_sim_params()
+    :return: the key as a hex string
+    """
+
+    content = json.dumps({"hinges": sorted(set(hinge_idxs)), "params": params, "model": get_model_hash()},
+                         sort_keys=True)
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def get_bake_horizon():
+    """
+    get the number of frames a cached bake needs to have. The genetic algorithm and 'Run best model' both bake up to
+    evaluation_frame, so they share their bakes. A stepped bake that stopped early is complete, even though it is
+    shorter.
+
+    :return: the number of frames
+    """
+
+    return 1 if stepped_bake else evaluation_frame
+
+
+def load_cached_bake(key, last_frame):
+    """
+    loads the member matrices of a bake from the bake cache
+
+    :param key: the key as returned by bake_cache_key()
+    :param last_frame: the last frame that is needed
+    :return: an array of shape (frames, members, 4, 4) starting at frame 1, or None if it is not cached
+    """
+
+    if bake_cache_dir is None:
+        return None
+
+    path = os.path.join(bpy.path.abspath(bake_cache_dir), key + ".npy")
+    if not os.path.isfile(path):
+        return None
+
+    bake = np.load(path)
+    if len(bake) < last_frame:
+        return None
+
+    # mark the bake as recently used for the eviction
+    os.utime(path)
+    return bake
+
+
+def store_cached_bake(key, bake):
+    """
+    stores the member matrices of a bake in the bake cache and removes the least recently used bakes when the cache
+    becomes larger than bake_cache_size
+
+    :param key: the key as returned by bake_cache_key()
+    :param bake: an array of shape (frames, members, 4, 4) starting at frame 1
+    """
+
+    directory = bpy.path.abspath(bake_cache_dir)
+    os.makedirs(directory, exist_ok=True)
+    # the workers share the cache, so a bake is written to a temporary file first and a reader never sees half of it
+    temporary_path = os.path.join(directory, f"{key}.{os.getpid()}.tmp")
+    with open(temporary_path, "wb") as file:
+        np.save(file, bake.astype(np.float32))
+    os.replace(temporary_path, os.path.join(directory, key + ".npy"))
+
+    sizes = {}
+    for name in os.listdir(directory):
+        try:
+            if name.endswith(".npy"):
+                path = os.path.join(directory, name)
+                sizes[path] = (os.path.getmtime(path), os.path.getsize(path))
+        except OSError:
+            # another worker evicted it in the meantime
+            pass
+
+    paths = sorted(sizes, key=lambda path: sizes[path][0])
+    total_size = sum(size for mtime, size in sizes.values())
+    for path in paths[:-1]:
+        if total_size <= bake_cache_size:
+            break
+        total_size -= sizes[path][1]
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def record_bake(last_frame):
+    """
+    reads the member matrices of every frame of the baked simulation
+
+    :param last_frame: the last frame that is read
+    :return: an array of shape (last_frame, members, 4, 4) starting at frame 1
+    """
+
+    bake = []
+    for frame in range(1, last_frame + 1):
+        bpy.context.scene.frame_set(frame=frame)
+        bake.append(get_member_matrices())
+    return np.array(bake)
+
+
+def play_cached_bake(scene, depsgraph=None):
+    """
+    frame change handler that moves the members to their cached location of the current frame
+    """
+
+    if cached_playback is None:
+        return
+
+    frame = min(max(scene.frame_current, 1), len(cached_playback)) - 1
+    for obj, matrix in zip(get_member_objects(), cached_playback[frame]):
+        obj.matrix_world = Matrix(matrix.tolist())
+
+
+def start_cached_playback(bake):
+    """
+    plays a cached bake instead of the simulation of the rigid body world
+
+    :param bake: an array of shape (frames, members, 4, 4) as returned by load_cached_bake()
+    """
+
+    global cached_playback, cached_playback_snapshot
+    stop_cached_playback()
+    cached_playback_snapshot = capture_scene_snapshot()
+    cached_playback = bake
+    bpy.context.scene.rigidbody_world.enabled = False
+    bpy.app.handlers.frame_change_post.append(play_cached_bake)
+
+
+def stop_cached_playback():
+    """
+    stops playing a cached bake and puts the scene back in the state from before it started playing
+    """
+
+    global cached_playback, cached_playback_snapshot
+    if cached_playback is None:
+        return
+
+    bpy.app.handlers.frame_change_post.remove(play_cached_bake)
+    cached_playback = None
+    bpy.context.scene.rigidbody_world.enabled = True
+    restore_scene_snapshot(cached_playback_snapshot)
+    cached_playback_snapshot = None
+
+
+def evaluate_chromosomes(chromosomes, context, params=None, use_cache=True):
+    """
+    evaluates a list of chromosomes. Chromosomes that are in the fitness cache, or that occur more than once in the
+    list, are only simulated once.
+
+    :param chromosomes: the chromosomes that are evaluated
+    :param params: the simulation parameters as returned by get_sim_params(), defaults to the current settings
+    :param use_cache: look the chromosomes up in the fitness cache, without it every unique chromosome is simulated
+    :return: the fitness scores in the same order as chromosomes
+    """
+
+    mytool = context.scene.my_tool
+    if params is None:
+        params = get_sim_params(mytool)
+    keys = [chromosome_key(chromosome, params) for chromosome in chromosomes]
+
+    unique_chromosomes = OrderedDict()
+    for key, chromosome in zip(keys, chromosomes):
+        unique_chromosomes.setdefault(key, chromosome)
+
+    scores = {key: get_cached_fitness(key) if use_cache else None for key in unique_chromosomes}
+    missing = [key for key in unique_chromosomes if scores[key] is None]
+    missing_chromosomes = [unique_chromosomes[key] for key in missing]
+    print(f"{len(chromosomes) - len(missing)} of {len(chromosomes)} chromosomes found in the fitness cache")
+
+    if worker_pool_size > 0:
+        missing_scores = evaluate_chromosomes_parallel(missing_chromosomes, params)
+    elif missing_chromosomes:
+        current_params = get_sim_params(mytool)
+        set_sim_params(mytool, params)
+        try:
+            ensure_physics_added(mytool)
+            missing_scores = []
+            for chromosome in missing_chromosomes:
+                score, timings = evaluate_chromosome_timed(chromosome, context)
+                log_chromosome_timings(chromosome, score, timings)
+                missing_scores.append(score)
+        finally:
+            set_sim_params(mytool, current_params)
+    else:
+        missing_scores = []
+
+    for key, score in zip(missing, missing_scores):
+        scores[key] = score
+        store_cached_fitness(key, score)
+
+    return [scores[key] for key in keys]
+
+
+def prescreen_chromosome(chromosome):
+    """
+    checks on the connectivity graph, without simulating, whether removing the hinges of a chromosome can bring the
+    structure down. It computes
+    - the fraction of the mass that is no longer connected to the supports, which falls for sure, and
+    - the largest fraction of removed hinges among the hinges that cross a horizontal plane, a cut through most of
+      these hinges lets the structure above it tip over or buckle.
+
+    :param chromosome: the chromosome
+    :return: a dictionary with the detached mass fraction, the cut fraction and whether the chromosome is hopeless
+    """
+
+    if connectivity_graph is None:
+        init_connectivity_graph()
+
+    removed = removed_hinge_mask(chromosome)
+    cut = np.unpackbits(connectivity_graph["crossing"] & removed, axis=1).sum(axis=1) / \
+        connectivity_graph["crossing_counts"]
+
+    edge_a, edge_b = connectivity_graph["edges"]
+    kept = np.unpackbits(removed)[connectivity_graph["edge_hinges"]] == 0
+    masses = connectivity_graph["masses"]
+    labels = connected_components(len(masses), edge_a[kept], edge_b[kept])
+    supported = np.isin(labels, labels[connectivity_graph["supports"]])
+
+    detached = float(masses[~supported].sum() / masses.sum())
+    cut = float(cut.max(initial=0))
+    return {"detached": detached, "cut": cut,
+            "hopeless": detached < prescreen_detached_fraction and cut < prescreen_cut_fraction}
+
+
+def standing_result(chromosome):
+    """
+    get the result of a chromosome that does not bring the structure down, like evaluate_chromosome() would return it
+    for a tower that still stands at its starting radius and height
+
+    :param chromosome: the chromosome
+    :return: the fitness score, or the objectives in multi objective mode
+    """
+
+    objectives = [connectivity_graph["start_radius"], connectivity_graph["start_height"], len(chromosome)]
+    if fitness_mode == "trajectory":
+        # it never falls and nothing hits the ground
+        objectives += [1.0, 0.0]
+    return objectives if multi_objective else scalarize_objectives(objectives)
+
+
+def prescreen_chromosomes(chromosomes):
+    """
+    runs prescreen_chromosome() on the chromosomes of a generation. With prescreen_mode "reject", every hopeless
+    chromosome is replaced by a new random chromosome, up to prescreen_retries times.
+
+    :param chromosomes: the chromosomes
+    :return: the chromosomes, with the rejected ones replaced, and a list that is True for the hopeless chromosomes
+    """
+
+    if prescreen_mode == "off":
+        return chromosomes, [False] * len(chromosomes)
+
+    chromosomes = list(chromosomes)
+    hopeless = []
+    for idx in range(0, len(chromosomes)):
+        screen = prescreen_chromosome(chromosomes[idx])
+        retries = prescreen_retries if prescreen_mode == "reject" else 0
+        while screen["hopeless"] and retries > 0:
+            chromosomes[idx] = random_chromosome()
+            screen = prescreen_chromosome(chromosomes[idx])
+            retries -= 1
+        hopeless.append(screen["hopeless"])
+
+    print(f"pre-screen: {sum(hopeless)} of {len(chromosomes)} chromosomes are hopeless")
+    return chromosomes, hopeless
+
+
+def evaluate_chromosomes_screened(evaluate, chromosomes, hopeless, context):
+    """
+    evaluates the chromosomes that passed the pre-screen and gives the hopeless ones the result of a standing tower
+
+    :param evaluate: evaluate_chromosomes() or evaluate_chromosomes_surrogate()
+    :param chromosomes: the chromosomes
+    :param hopeless: a list that is True for the hopeless chromosomes, see prescreen_chromosomes()
+    :return: the fitness scores (or objectives) in the same order as chromosomes
+    """
+
+    simulated = [chromosome for chromosome, skip in zip(chromosomes, hopeless) if not skip]
+    results = iter(evaluate(simulated, context) if simulated else [])
+    return [standing_result(chromosome) if skip else next(results) for chromosome, skip in zip(chromosomes, hopeless)]
+
+
+def rank_correlation(scores1, scores2):
+    """
+    computes the spearman rank correlation between two lists of scores, tied scores get their average rank
+
+    :return: the correlation between [-1,1], or nan when one of the lists is constant
+    """
+
+    def ranks(scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        order = np.argsort(scores, kind="stable")
+        result = np.empty(len(scores))
+        result[order] = np.arange(len(scores))
+        for value in np.unique(scores):
+            result[scores == value] = result[scores == value].mean()
+        return result
+
+    ranks1 = ranks(scores1)
+    ranks2 = ranks(scores2)
+    if len(ranks1) < 2 or ranks1.std() == 0 or ranks2.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(ranks1, ranks2)[0, 1])
+
+
+def evaluate_chromosomes_surrogate(chromosomes, context):
+    """
+    evaluates a list of chromosomes in two steps. All chromosomes are first evaluated with the cheap surrogate_params
+    and only the best surrogate_fraction of them is re-evaluated with the full simulation parameters. The other
+    chromosomes keep their surrogate score, capped at the lowest full score, so they never outrank a chromosome that
+    was fully evaluated.
+
+    :param chromosomes: the chromosomes that are evaluated
+    :return: the fitness scores in the same order as chromosomes
+    """
+
+    full_params = get_sim_params(context.scene.my_tool)
+    surrogate_scores = evaluate_chromosomes(chromosomes, context, dict(full_params, **surrogate_params))
+
+    # the promoted chromosomes are the best ones of the surrogate, so the correlation is only measured on generations
+    # where every chromosome is fully evaluated
+    calibrate = surrogate_calibration_interval > 0 and generation % surrogate_calibration_interval == 0
+    full_count = len(chromosomes) if calibrate else \
+        min(len(chromosomes), max(1, ceil(surrogate_fraction * len(chromosomes))))
+    promoted = sorted(range(0, len(chromosomes)), key=lambda idx: surrogate_scores[idx], reverse=True)[:full_count]
+    full_scores = evaluate_chromosomes([chromosomes[idx] for idx in promoted], context, full_params)
+
+    scores = [min(score, min(full_scores)) for score in surrogate_scores]
+    for idx, score in zip(promoted, full_scores):
+        scores[idx] = score
+
+    print(f"surrogate: {full_count} of {len(chromosomes)} chromosomes fully evaluated")
+    if calibrate:
+        correlation = rank_correlation(surrogate_scores, scores)
+        surrogate_correlations.append(correlation)
+        print(f"surrogate: rank correlation {correlation} over the whole pool")
+
+    return scores
+
+
+def run_generation(context):
+    """
+    Runs the simulations of a single generation of chromosomes and evaluates
+    those.
+    """
+    global generation
+    print("run generation " + str(generation))
+    start_time = time.perf_counter()
+
+    global chromosome_fitness, chromosomes_idxs
+
+    if multi_objective:
+        run_generation_nsga2(context)
+    else:
+        if generation == 0:
+            init_chromosomes()
+        else:
+            mutate_chromosomes()
+
+        chromosomes_idxs, hopeless = prescreen_chromosomes(chromosomes_idxs)
+        chromosome_fitness = evaluate_chromosomes_screened(
+            evaluate_chromosomes_surrogate if use_surrogate else evaluate_chromosomes, chromosomes_idxs, hopeless,
+            context)
+
+    log_generation_timings(time.perf_counter() - start_time)
+    write_profile(profile_path)
+    generation += 1
+
+    # print results
+    avg_score = 0
+    min_score = 1
+    max_score = 0
+    print("chromosome scores:")
+    for fitness in chromosome_fitness:
+        min_score = min(min_score, fitness)
+        max_score = max(max_score, fitness)
+        avg_score += fitness
+        print(fitness)
+
+    avg_score = avg_score / len(chromosome_fitness)
+
+    print("avg: " + str(avg_score))
+    print("min: " + str(min_score))
+    print("max: " + str(max_score))
+
+    generation_history.append({"avg": avg_score, "min": min_score, "max": max_score})
+    if checkpoint_interval > 0 and generation % checkpoint_interval == 0:
+        save_checkpoint(context)
+    return generation_history[-1]
+
+
+def select_parent():
+    """
+    selects a parent from the current pool of chromosomes with a binary tournament
+
+    :return: the chromosome that won the tournament
+    """
+
+    idx1 = randint(0, len(chromosomes_idxs) - 1)
+    idx2 = randint(0, len(chromosomes_idxs) - 1)
+    return chromosomes_idxs[idx1] if chromosome_fitness[idx1] >= chromosome_fitness[idx2] else chromosomes_idxs[idx2]
+
+
+def breed_chromosome(selection=select_parent):
+    """
+    creates a single new chromosome from the current pool, with one of the 4 strategies of mutate_chromosomes()
+    picked at random
+
+    :param selection: function that selects a parent from the pool
+    :return: the new chromosome
+    """
+
+    strategy = random()
+    if len(chromosomes_idxs) < 2 or strategy < 0.25:
+        return random_chromosome()
+    if strategy < 0.5:
+        return crossover(selection(), selection())
+    if strategy < 0.75:
+        return random_mutations(crossover(selection(), selection()))
+    return random_mutations(selection())
+
+
+def insert_chromosome(chromosome, fitness):
+    """
+    inserts an evaluated chromosome in the pool. When the pool is full it replaces the worst chromosome, if that one
+    is worse than the new chromosome.
+
+    :param chromosome: the evaluated chromosome
+    :param fitness: the fitness score of the chromosome
+    """
+
+    if len(chromosomes_idxs) < chromosome_pool_size:
+        chromosomes_idxs.append(chromosome)
+        chromosome_fitness.append(fitness)
+        return
 
+    worst_idx = min(range(0, len(chromosome_fitness)), key=lambda idx: chromosome_fitness[idx])
+    if chromosome_fitness[worst_idx] < fitness:
+        chromosomes_idxs[worst_idx] = chromosome
+        chromosome_fitness[worst_idx] = fitness
 
-# before executing this script. MAKE SURE YOUR BUILD IS CENTERED AROUND ITS ORIGIN.
-# otherwise the evaluation might not work properly
-def evaluate_demolition(removed_clusters, w_r=3, w_h=5, w_d=1, hard_max_removed_clusters=36, hard_max_radius=50,
-                        hard_max_height=50):
+
+def run_steady_state(context, evaluations):
     """
-    evaluates the demolition of the current selected frame
+    Runs the genetic algorithm asynchronously on the worker pool. As soon as a worker finishes a chromosome, that
+    chromosome is inserted in the pool and a new chromosome is bred from the pool for the worker, so slow bakes no
+    longer stall the other workers. Chromosomes that are in the fitness cache are inserted without a worker.
 
-    :param w_d: weight factor for imploded objects
-    :param w_h: weight factor for height
-    :param w_r: weight factor for radius
-    :param removed_clusters: number of objects that were removed in the simulation
-    :param hard_max_removed_clusters: maximum number of objects that can be removed in the simulation
-    :param hard_max_radius: maximum demolition radius.
-    :param hard_max_height: maximum height of the building (default is the height of the building aka 50 meters)
-    :return: the resulting evaluation between [0,1]
+    :param evaluations: the number of chromosomes that are evaluated
+    :return: the scores of the resulting pool and the throughput in evaluations per hour
     """
 
-    max_radius = 0
-    max_height = 0
-    for obj in bpy.context.scene.objects:
-        for m in materials:
-            if m == "ground":
+    global generation, chromosomes_idxs, chromosome_fitness, evaluation_count
+    if len(worker_processes) != worker_pool_size:
+        start_worker_pool(worker_pool_size)
+
+    # a resumed run already has a pool, see load_checkpoint()
+    if generation == 0 and evaluation_count == 0:
+        chromosomes_idxs = []
+        chromosome_fitness = []
+
+    params = get_sim_params(context.scene.my_tool)
+    idle_workers = queue.Queue()
+    for worker in worker_processes:
+        idle_workers.put(worker)
+
+    def evaluate(chromosome):
+        worker = idle_workers.get()
+        try:
+            return request_worker_score(worker, chromosome, params)
+        finally:
+            idle_workers.put(worker)
+
+    start_time = time.time()
+    evaluated = 0
+    submitted = 0
+    running = {}
+    with ThreadPoolExecutor(max_workers=len(worker_processes)) as executor:
+        while evaluated < evaluations:
+            # keep every worker busy
+            while submitted < evaluations and len(running) < len(worker_processes):
+                [chromosome], hopeless = prescreen_chromosomes([breed_chromosome()])
+                key = chromosome_key(chromosome, params)
+                submitted += 1
+
+                fitness = standing_result(chromosome) if hopeless[0] else get_cached_fitness(key)
+                if fitness is not None:
+                    insert_chromosome(chromosome, fitness)
+                    evaluated += 1
+                    evaluation_count += 1
+                else:
+                    running[executor.submit(evaluate, chromosome)] = (chromosome, key)
+
+            if not running:
                 continue
-            if obj.name.startswith(m):
-                loc = obj.matrix_world.translation
-                max_height = max(loc[2], max_height)
-                max_radius = max(sqrt(loc[0] ** 2 + loc[1] ** 2),
-                                 max_radius)
-
-    r_norm = max_radius / hard_max_radius
-    h_norm = max_height / hard_max_height
-    d_norm = removed_clusters / hard_max_removed_clusters
-    r_norm = 1 if r_norm > 1 else r_norm
-    h_norm = 1 if h_norm > 1 else h_norm
-    d_norm = 1 if d_norm > 1 else d_norm
 
-    print(f"r{max_radius}")
-    print(f"h {max_height}")
-    print(f"d {removed_clusters}")
-    print(f"r_norm {r_norm}")
-    print(f"h_norm {h_norm}")
-    print(f"d_norm {d_norm}")
+            done, pending = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                chromosome, key = running.pop(future)
+                store_cached_fitness(key, future.result())
+                insert_chromosome(chromosome, future.result())
+                evaluated += 1
+                evaluation_count += 1
+                if checkpoint_interval > 0 and evaluation_count % (checkpoint_interval * chromosome_pool_size) == 0:
+                    save_checkpoint(context)
+
+    log_generation_timings(time.time() - start_time)
+    generation += 1
+    evaluations_per_hour = evaluated / max(time.time() - start_time, 1e-9) * 3600
 
-    result = (w_r * (1 - r_norm) + w_h * (1 - h_norm) ** 3 + w_d * (1 - d_norm)) / (w_r + w_h + w_d)
-    return result
+    print(f"evaluated {evaluated} chromosomes, {evaluations_per_hour:.1f} evaluations per hour")
+    print(f"avg: {sum(chromosome_fitness) / len(chromosome_fitness)}")
+    print(f"min: {min(chromosome_fitness)}")
+    print(f"max: {max(chromosome_fitness)}")
 
+    generation_history.append({"avg": sum(chromosome_fitness) / len(chromosome_fitness),
+                               "min": min(chromosome_fitness), "max": max(chromosome_fitness),
+                               "evaluations": evaluated, "evaluations_per_hour": evaluations_per_hour})
+    if checkpoint_interval > 0:
+        save_checkpoint(context)
+    return generation_history[-1]
 
-def add_physics_all_object(breaking_threshold):
+
+def non_dominated_sort(objectives):
     """
-    set the appropriate physics properties to each object in the scene
+    sorts solutions into pareto fronts with the efficient non-dominated sort with binary search (ENS-BS). The solutions
+    are sorted on their objectives first, so a solution can only be dominated by the solutions before it. Every
+    solution is then put in the first front that has no solution that dominates it, which is found with a binary
+    search over the fronts.
 
-    :param breaking_threshold: The threshold to which the hinges should break
+    :param objectives: an array of shape (solutions, objectives), all objectives are minimised
+    :return: a list of fronts, each a list of indexes in objectives, the best front first
     """
 
-    global physics_added
-    for obj in bpy.context.scene.objects:
-        bpy.ops.object.select_all(action='DESELECT')
-        for m_key in materials:
-            if obj.name.startswith(m_key):
-                add_material_properties(obj.name, materials[m_key])
-                break
-        bpy.ops.object.select_all(action='DESELECT')
+    objectives = np.asarray(objectives, dtype=np.float64)
+    fronts = []
+    # lexsort sorts on the last key first
+    for idx in np.lexsort(objectives.T[::-1]):
+        low = 0
+        high = len(fronts)
+        while low < high:
+            mid = (low + high) // 2
+            front = objectives[fronts[mid]]
+            if np.any(np.all(front <= objectives[idx], axis=1) & np.any(front < objectives[idx], axis=1)):
+                low = mid + 1
+            else:
+                high = mid
+
+        if low == len(fronts):
+            fronts.append([])
+        fronts[low].append(int(idx))
+    return fronts
+
+
+def crowding_distance(objectives):
+    """
+    computes the crowding distance of the solutions of a front, the solutions at the ends of the front get an infinite
+    distance
 
-    for obj in bpy.context.scene.objects:
-        bpy.ops.object.select_all(action='DESELECT')
-        if obj.name.startswith("hinge"):
-            add_hinge_properties(obj.name, breaking_threshold)
+    :param objectives: an array of shape (solutions, objectives) of a single front
+    :return: an array with the crowding distance of every solution
+    """
 
-        bpy.ops.object.select_all(action='DESELECT')
+    objectives = np.asarray(objectives, dtype=np.float64)
+    distance = np.zeros(len(objectives))
+    if len(objectives) <= 2:
+        return distance + np.inf
 
-    physics_added = True
+    for values in objectives.T:
+        order = np.argsort(values, kind="stable")
+        distance[order[[0, -1]]] = np.inf
+        span = values[order[-1]] - values[order[0]]
+        if span > 0:
+            distance[order[1:-1]] += (values[order[2:]] - values[order[:-2]]) / span
+    return distance
 
 
-def remove_physics_all_object():
+def nsga2_rank(objectives):
     """
-    removes the physics of all objects
+    computes the front and crowding distance of every solution
+
+    :param objectives: an array of shape (solutions, objectives)
+    :return: an array with the index of the front of every solution and an array with their crowding distance
     """
 
-    global physics_added
-    for obj in bpy.context.scene.objects:
-        bpy.ops.object.select_all(action='DESELECT')
-        for m_key in materials:
-            if obj.name.startswith(m_key):
-                remove_material_properties(obj.name)
-                break
+    ranks = np.zeros(len(objectives), dtype=np.int64)
+    crowding = np.zeros(len(objectives))
+    for rank, front in enumerate(non_dominated_sort(objectives)):
+        ranks[front] = rank
+        crowding[front] = crowding_distance(np.asarray(objectives, dtype=np.float64)[front])
+    return ranks, crowding
 
-    for obj in bpy.context.scene.objects:
-        bpy.ops.object.select_all(action='DESELECT')
-        if obj.name.startswith("hinge"):
-            remove_hinge_properties(obj.name)
-        bpy.ops.object.select_all(action='DESELECT')
 
-    physics_added = False
+def nsga2_select(objectives, size):
+    """
+    selects the best solutions front by front, the last front that does not fit completely is cut on crowding
+    distance
 
+    :param objectives: an array of shape (solutions, objectives)
+    :param size: the number of solutions that are selected
+    :return: a list with the indexes of the selected solutions
+    """
 
-def add_material_properties(object_name, mat):
+    selected = []
+    for front in non_dominated_sort(objectives):
+        if len(selected) + len(front) > size:
+            crowding = crowding_distance(np.asarray(objectives, dtype=np.float64)[front])
+            selected += [front[idx] for idx in np.argsort(-crowding, kind="stable")[:size - len(selected)]]
+            break
+        selected += front
+    return selected
+
+
+def update_pareto_archive(chromosomes, objectives):
     """
-    adds the appropriate physics properties to an object with name object_name according to its material,
-    which is specified in the name itself. If an object starts with the name 'metal' we will give it metal properties.
+    adds evaluated chromosomes to the pareto archive and removes the chromosomes that are dominated. When the archive
+    becomes larger than pareto_archive_size the most crowded chromosomes are removed.
 
-    :param object_name: The name of the object to apply physics properties to.
-    :param mat: the material to apply to the object
+    :param chromosomes: the evaluated chromosomes
+    :param objectives: their objectives
     """
 
-    obj = bpy.context.scene.objects[object_name]
-    obj.select_set(True)
-    bpy.context.view_layer.objects.active = obj
+    global pareto_archive
+    candidates = OrderedDict((chromosome_key(entry["chromosome"], {}), entry) for entry in pareto_archive)
+    for chromosome, objective in zip(chromosomes, objectives):
+        candidates.setdefault(chromosome_key(chromosome, {}), {"chromosome": chromosome, "objectives": objective})
 
-    bpy.ops.rigidbody.object_add(type=mat["type"] if mat["type"] else "ACTIVE")
+    candidates = list(candidates.values())
+    archive_objectives = np.asarray([entry["objectives"] for entry in candidates], dtype=np.float64)
+    front = non_dominated_sort(archive_objectives)[0] if candidates else []
+    if len(front) > pareto_archive_size:
+        crowding = crowding_distance(archive_objectives[front])
+        front = [front[idx] for idx in np.argsort(-crowding, kind="stable")[:pareto_archive_size]]
+    pareto_archive = [candidates[idx] for idx in front]
 
-    if "collision_shape" in mat:
-        bpy.ops.rigidbody.shape_change(type=mat["collision_shape"])
-    else:
-        bpy.ops.rigidbody.shape_change(type='CONVEX_HULL')
 
-    bpy.ops.object.modifier_add(type='COLLISION')
+def best_in_archive(**kwargs):
+    """
+    finds the chromosome of the pareto archive with the best weighted score, see scalarize_objectives()
 
-    if "density" in mat:
-        bpy.ops.rigidbody.mass_calculate(material='Custom', density=mat["density"])
+    :param kwargs: the weights and maxima of score_demolition() or score_trajectory()
+    :return: the entry of the archive, or None if the archive is empty
+    """
 
-    if "friction" in mat:
-        obj.rigid_body.friction = mat["friction"]
+    if not pareto_archive:
+        return None
+    return max(pareto_archive, key=lambda entry: scalarize_objectives(entry["objectives"], **kwargs))
 
-    if "restitution" in mat:
-        obj.rigid_body.restitution = mat["restitution"]
 
-    obj.select_set(False)
-    bpy.context.view_layer.objects.active = None
+def run_generation_nsga2(context):
+    """
+    Runs a single generation of NSGA-II. The offspring is bred from parents that are selected with a tournament on
+    their front and crowding distance, and the best chromosome_pool_size chromosomes of the parents and the offspring
+    together survive. chromosome_fitness is set to the weighted score of the survivors.
+    """
 
+    global chromosomes_idxs, chromosome_fitness, chromosome_objectives
+    if generation == 0:
+        init_chromosomes()
+        chromosomes_idxs, hopeless = prescreen_chromosomes(chromosomes_idxs)
+        chromosome_objectives = evaluate_chromosomes_screened(evaluate_chromosomes, chromosomes_idxs, hopeless, context)
+        update_pareto_archive(chromosomes_idxs, chromosome_objectives)
+    else:
+        ranks, crowding = nsga2_rank(chromosome_objectives)
 
-def add_hinge_properties(object_name, breaking_threshold):
-    """
-    add physics properties to the given hinge
+        def selection():
+            idx1 = randint(0, len(chromosomes_idxs) - 1)
+            idx2 = randint(0, len(chromosomes_idxs) - 1)
+            if ranks[idx1] != ranks[idx2]:
+                return chromosomes_idxs[idx1] if ranks[idx1] < ranks[idx2] else chromosomes_idxs[idx2]
+            return chromosomes_idxs[idx1] if crowding[idx1] >= crowding[idx2] else chromosomes_idxs[idx2]
 
-    :param object_name: the hinge object
-    :param breaking_threshold: the breaking threshold of the hinge
-    """
+        offspring = [breed_chromosome(selection) for idx in range(0, chromosome_pool_size)]
+        offspring, hopeless = prescreen_chromosomes(offspring)
+        offspring_objectives = evaluate_chromosomes_screened(evaluate_chromosomes, offspring, hopeless, context)
+        update_pareto_archive(offspring, offspring_objectives)
 
-    obj = bpy.context.scene.objects[object_name]
-    obj.select_set(True)
-    bpy.context.view_layer.objects.active = obj
-
-    bpy.ops.rigidbody.constraint_add()
-    bpy.context.object.rigid_body_constraint.type = 'HINGE'
-    bpy.context.object.rigid_body_constraint.disable_collisions = False
-    bpy.context.object.rigid_body_constraint.use_breaking = True
-    bpy.context.object.rigid_body_constraint.object1 = obj.parent
-    next_paired_obj = find_closest_object(obj)
-    if next_paired_obj is not None:
-        bpy.context.object.rigid_body_constraint.object2 = next_paired_obj
-    bpy.context.object.rigid_body_constraint.breaking_threshold = breaking_threshold
+        population = chromosomes_idxs + offspring
+        population_objectives = chromosome_objectives + offspring_objectives
+        survivors = nsga2_select(population_objectives, chromosome_pool_size)
+        chromosomes_idxs = [population[idx] for idx in survivors]
+        chromosome_objectives = [population_objectives[idx] for idx in survivors]
 
-    obj.select_set(False)
-    bpy.context.view_layer.objects.active = None
+    chromosome_fitness = [scalarize_objectives(objectives) for objectives in chromosome_objectives]
+    print(f"pareto archive: {len(pareto_archive)} chromosomes")
 
 
-def remove_material_properties(object_name):
+def get_checkpoint_path():
     """
-    remove the physics properties of an object
+    get the path of the checkpoint file, see checkpoint_path
 
-    :param object_name: name of the object
-    :return:
+    :return: the absolute path, or None if the .blend file is not saved and no checkpoint_path is set
     """
-    obj = bpy.context.scene.objects[object_name]
-    bpy.context.view_layer.objects.active = obj
-    obj.select_set(True)
-
-    bpy.ops.rigidbody.object_remove()
-    bpy.ops.object.modifier_remove(modifier="Collision")
 
-    obj.select_set(False)
-    bpy.context.view_layer.objects.active = None
+    if checkpoint_path is not None:
+        return bpy.path.abspath(checkpoint_path)
+    if bpy.data.filepath:
+        return os.path.splitext(bpy.data.filepath)[0] + "_checkpoint.npz"
+    return None
 
 
-def remove_hinge_properties(object_name):
+def pack_chromosomes(chromosomes):
     """
-    remove the physics properties of a hinge
+    stacks the rows of a list of chromosomes into a single array, so they can be stored in a .npz file
 
-    :param object_name: name of the hinge
-    :return:
+    :param chromosomes: a list of chromosomes
+    :return: an array with the rows of all chromosomes and an array with the number of rows of every chromosome
     """
-    obj = bpy.context.scene.objects[object_name]
-    bpy.context.view_layer.objects.active = obj
-    obj.select_set(True)
 
-    bpy.ops.rigidbody.constraint_remove()
+    rows = np.concatenate([empty_chromosome()] + list(chromosomes))
+    return rows, np.array([len(chromosome) for chromosome in chromosomes], dtype=np.int64)
 
-    obj.select_set(False)
-    bpy.context.view_layer.objects.active = None
 
-
-def random_chromosome():
+def unpack_chromosomes(rows, counts):
     """
-    Generates a random chromosome based on some global parameters. A chromosome
-    contains a number of hinge clusters(genes) that are removed from the
-    standard model.
+    splits the rows of pack_chromosomes() back into chromosomes
 
-    :param max_chromosome_size: the maximum number of hinge clusters that are removed
-    :param accept_new_block: a threshold for which random block are accepted
-    :return: a chromosome, a list of hinge clusters.
+    :return: a list of chromosomes
     """
-    chromosome = []
-    for idx in range(0, max_chromosome_size):
-        if random() < accept_new_block:
-            not_in_chromosome = True
-            obj_idx = randint(0, len(hinge_set) - 1)
-            for idxs in chromosome:
-                if obj_idx in idxs:
-                    not_in_chromosome = False
-
-            if not_in_chromosome:
-                chromosome.append(get_closest_hinges(obj_idx))
-    print(chromosome)
-    return chromosome
 
+    return np.split(rows, np.cumsum(counts)[:-1]) if len(counts) else []
 
-def crossover(parent1, parent2):
+
+def save_checkpoint(context):
+    """
+    saves the state of the genetic algorithm: the pool with its fitness (and objectives), the pareto archive, the
+    generation, the state of the random number generator, the simulation parameters and the hash of the model. The
+    file is written next to the old checkpoint first and then moved over it, so a crash while writing keeps the old
+    checkpoint intact.
     """
-    Generates a new chromosome based on the 2 parent chromosomes. It randomly
-    selects genes from the first or second parents and puts these together in
-    the new chromosome
 
-    :param parent1: first parent used in the crossover
-    :param parent2: second parent used in the crossover
-    :return: a new chromosome base on parent1 and parent2
+    path = get_checkpoint_path()
+    if path is None:
+        return
+
+    rows, counts = pack_chromosomes(chromosomes_idxs)
+    archive_rows, archive_counts = pack_chromosomes([entry["chromosome"] for entry in pareto_archive])
+    state = {"generation": generation,
+             "evaluation_count": evaluation_count,
+             "history": generation_history,
+             "surrogate_correlations": surrogate_correlations,
+             "random_state": getstate(),
+             "params": get_sim_params(context.scene.my_tool),
+             "model": get_model_hash(),
+             "hinges": len(hinge_set)}
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        np.savez_compressed(file, state=json.dumps(state), chromosomes=rows, counts=counts,
+                            fitness=np.array(chromosome_fitness, dtype=np.float64),
+                            objectives=np.array(chromosome_objectives, dtype=np.float64),
+                            archive_chromosomes=archive_rows, archive_counts=archive_counts,
+                            archive_objectives=np.array([entry["objectives"] for entry in pareto_archive],
+                                                        dtype=np.float64))
+    os.replace(temp_path, path)
+    print(f"checkpoint of generation {generation} written to {path}")
+
+
+def load_checkpoint(context, path=None):
     """
-    chromosome = []
-    max_size = max(len(parent1), len(parent2))
-    for idx in range(0, max_size):
-        if random() < 0.5:
-            if idx < len(parent1):
-                chromosome.append(parent1[idx])
-        else:
-            if idx < len(parent2):
-                chromosome.append(parent2[idx])
-    return chromosome
+    restores the state of the genetic algorithm from a checkpoint, see save_checkpoint()
 
+    :param path: the checkpoint file, defaults to get_checkpoint_path()
+    :return: True if a checkpoint was loaded, False if there is no checkpoint
+    """
 
-def random_mutations(chromosome):
+    global chromosomes_idxs, chromosome_fitness, chromosome_objectives, pareto_archive, generation, evaluation_count
+    global generation_history, surrogate_correlations
+    path = path or get_checkpoint_path()
+    if path is None or not os.path.isfile(path):
+        return False
+
+    with np.load(path) as checkpoint:
+        state = json.loads(str(checkpoint["state"]))
+        if state["hinges"] != len(hinge_set) or state["model"] not in (None, get_model_hash()):
+            raise RuntimeError(f"the checkpoint {path} belongs to another version of the model")
+
+        chromosomes_idxs = unpack_chromosomes(checkpoint["chromosomes"], checkpoint["counts"])
+        chromosome_fitness = checkpoint["fitness"].tolist()
+        chromosome_objectives = checkpoint["objectives"].tolist()
+        pareto_archive = [{"chromosome": chromosome, "objectives": objectives} for chromosome, objectives in
+                          zip(unpack_chromosomes(checkpoint["archive_chromosomes"], checkpoint["archive_counts"]),
+                              checkpoint["archive_objectives"].tolist())]
+
+    generation = state["generation"]
+    evaluation_count = state["evaluation_count"]
+    generation_history = state["history"]
+    surrogate_correlations = state["surrogate_correlations"]
+    # json turns the tuples of the state into lists
+    setstate((state["random_state"][0], tuple(state["random_state"][1]), state["random_state"][2]))
+    set_sim_params(context.scene.my_tool, state["params"])
+    print(f"resumed generation {generation} from {path}")
+    return True
+
+
+def time_evaluation(chromosomes, context, params):
     """
-    Randomly mutates the input chromosome. By replacing a gene based on the
-    global parameter mutation_rate.
+    evaluates the chromosomes without the fitness cache, so the wall time is that of the bakes. The worker pool is
+    started before the timer, so launching it is not part of the time.
 
-    :param chromosome: chromosome that is mutated
-    :return: a new mutated chromosome based
+    :param chromosomes: the chromosomes to evaluate
+    :param params: the simulation parameters, see get_sim_params()
+    :return: the scores and the wall time in seconds
     """
-    new_chromosome = []
-    for idx in range(0, len(chromosome)):
-        if random() < mutation_rate:
-            while True:
-                obj_idx = randint(0, len(hinge_set) - 1)
-                not_in_chromosome = True
-                for idxs in chromosome:
-                    if obj_idx in idxs:
-                        not_in_chromosome = False
-
-                if not_in_chromosome:
-                    chromosome.append(get_closest_hinges(obj_idx))
-                    break
-        else:
-            new_chromosome.append(chromosome[idx])
-    return new_chromosome
 
+    if worker_pool_size > 0 and len(worker_processes) != worker_pool_size:
+        start_worker_pool(worker_pool_size)
+    start_time = time.perf_counter()
+    scores = evaluate_chromosomes(chromosomes, context, params, use_cache=False)
+    return scores, time.perf_counter() - start_time
 
-def init_chromosomes():
+
+def compare_scores(reference_scores, scores):
     """
-    creates a pool of random chromosomes and saves them in the global parameter
-    chromosomes_idxs
+    compares the scores of a cheaper simulation with the scores of the same chromosomes in a reference simulation
+
+    :return: a dictionary with the rank correlation, the mean score error and whether both are within
+    calibration_min_correlation and calibration_max_error
     """
 
-    for chromosome_idx in range(0, chromosome_pool_size):
-        chromosomes_idxs[chromosome_idx] = random_chromosome()
+    correlation = rank_correlation(reference_scores, scores)
+    error = float(np.abs(np.array(scores) - np.array(reference_scores)).mean())
+    # a nan correlation (all scores equal) does not pass the tolerance
+    matches = correlation >= calibration_min_correlation and error <= calibration_max_error
+    return {"correlation": correlation, "error": error, "matches": bool(matches)}
 
 
-def mutate_chromosomes():
+def calibrate_fidelity(context, chromosome_count):
     """
-    This function will mutate the current pool of chromosomes. It has 4
-    different mutation strategies that all come up with an equal number of new
-    chromosomes.
-    1. Take the two best chromosomes in the pool and create children using the
-    crossover function.
-    2. Take the two best chromosomes in the pool and create children using the
-    crossover function but also perform random mutations on these children.
-    3. Create new random chromosomes
-    4. Use the two best chromosomes in the pool and mutate those.
-
-    The new chromosomes are saved in the global variable chromosomes_idxs.
+    finds how far the substeps, solver iterations and speed can be lowered before the ranking of the chromosomes
+    changes. A fixed set of random chromosomes is evaluated with calibration_reference and with every combination of
+    calibration_grid, on the worker pool if there is one. A faster simulation covers the same time in fewer frames, so
+    the evaluation frame is scaled with the speed.
+
+    :param chromosome_count: the number of chromosomes in the reference set
+    :return: a dictionary with the reference parameters, the rank correlation, score error and wall time of every
+    setting and the recommended setting, which is the fastest one within calibration_min_correlation and
+    calibration_max_error, or None if no setting is
     """
-    global chromosomes_idxs
-    score_dict = {}
-    for idx in range(0, len(chromosome_fitness)):
-        score_dict[idx] = chromosome_fitness[idx]
 
-    sorted_dict = sorted(score_dict.items(), key=lambda item: item[1], reverse=True)
-    parent1 = chromosomes_idxs[sorted_dict[0][0]]
-    parent2 = chromosomes_idxs[sorted_dict[1][0]]
+    mytool = context.scene.my_tool
+    # the reference set is ranked on the weighted score, also in multi objective mode
+    params = dict(get_sim_params(mytool), multi_objective=False)
+    chromosomes = [random_chromosome() for idx in range(0, chromosome_count)]
+
+    def frame_for_speed(speed):
+        return max(2, round(params["evaluation_frame"] * calibration_reference["speed"] / speed))
+
+    reference_params = dict(params, evaluation_frame=frame_for_speed(calibration_reference["speed"]),
+                            **calibration_reference)
+    reference_scores, reference_time = time_evaluation(chromosomes, context, reference_params)
+    print(f"calibration reference {calibration_reference}: {reference_time:.1f}s")
+
+    results = []
+    for substeps in calibration_grid["substeps"]:
+        for solver_iterations in calibration_grid["solver_iterations"]:
+            for speed in calibration_grid["speed"]:
+                setting = {"substeps": substeps, "solver_iterations": solver_iterations, "speed": speed}
+                scores, wall_time = time_evaluation(chromosomes, context,
+                                                    dict(params, evaluation_frame=frame_for_speed(speed), **setting))
+                result = dict(setting, evaluation_frame=frame_for_speed(speed),
+                              **compare_scores(reference_scores, scores), time=wall_time)
+                results.append(result)
+                print(f"substeps {substeps}, solver iterations {solver_iterations}, speed {speed}: "
+                      f"rank correlation {result['correlation']:.3f}, error {result['error']:.4f}, "
+                      f"{result['time']:.1f}s")
+
+    accepted = [result for result in results if result["matches"]]
+    recommended = min(accepted, key=lambda result: result["time"]) if accepted else None
+    if recommended is None:
+        print("no setting is within the tolerance, keep the reference")
+    else:
+        print(f"recommended: substeps {recommended['substeps']}, solver iterations "
+              f"{recommended['solver_iterations']}, speed {recommended['speed']}, evaluation frame "
+              f"{recommended['evaluation_frame']} ({reference_time / max(recommended['time'], 1e-9):.1f}x faster "
+              f"than the reference)")
 
-    new_chromosomes = []
-    for x in range(0, chromosome_pool_size // 2):
-        new_chromosome = crossover(parent1, parent2)
-        if x % 2:
-            new_chromosome = random_mutations(new_chromosome)
-        new_chromosomes.append(new_chromosome)
+    return {"reference": dict(reference_params, time=reference_time), "chromosomes":
+            [chromosome_to_lists(chromosome) for chromosome in chromosomes], "results": results,
+            "recommended": recommended}
 
-    for x in range(0, chromosome_pool_size // 4):
-        new_chromosomes.append(random_chromosome())
 
-    for x in range(0, chromosome_pool_size // 4):
-        if x % 2:
-            new_chromosomes.append(random_mutations(parent1))
-        else:
-            new_chromosomes.append(random_mutations(parent2))
+def check_deactivation(context, chromosome_count):
+    """
+    checks that sleeping members do not change the scores. A fixed set of random chromosomes is evaluated without
+    deactivation and with the deactivation_mode of the settings, see compare_scores().
 
-    chromosomes_idxs = new_chromosomes
+    :param chromosome_count: the number of random chromosomes
+    :return: a dictionary with the rank correlation, score error and wall time of both modes, and whether the scores
+    are within calibration_min_correlation and calibration_max_error of the baseline
+    """
 
+    mytool = context.scene.my_tool
+    params = dict(get_sim_params(mytool), multi_objective=False)
+    chromosomes = [random_chromosome() for idx in range(0, chromosome_count)]
 
-def remove_physics_hinge(hinge_idxs):
-    for i in hinge_idxs:
-        remove_hinge_properties(hinge_set[i])
+    times = {}
+    scores = {}
+    for mode in ["off", params["deactivation"]]:
+        scores[mode], times[mode] = time_evaluation(chromosomes, context, dict(params, deactivation=mode))
+        print(f"deactivation {mode}: {times[mode]:.1f}s")
 
+    comparison = compare_scores(scores["off"], scores[params["deactivation"]])
+    print(f"deactivation {params['deactivation']}: rank correlation {comparison['correlation']:.3f}, error "
+          f"{comparison['error']:.4f}, {times['off'] / max(times[params['deactivation']], 1e-9):.1f}x faster than "
+          f"without deactivation, {'matches' if comparison['matches'] else 'does not match'} the baseline")
 
-def add_physics_hinge(hinge_idxs, my_tool):
-    for i in hinge_idxs:
-        add_hinge_properties(hinge_set[i], my_tool.dem_threshold_float)
+    return dict(comparison, params=params, chromosomes=[chromosome_to_lists(chromosome) for chromosome in chromosomes],
+                baseline_time=times["off"], time=times[params["deactivation"]])
 
 
-def evaluate_chromosome(chromosome, context):
+def parse_script_args(args):
     """
-    Runs the simulations of a single chromosome and evaluates it.
+    parses the command line arguments of the script, see get_script_args()
 
-    :param chromosome: the chromosome that is evaluated.
-    :return : The fitness score of the chromosome
+    :param args: a list of arguments
+    :return: the parsed arguments
     """
-    scene = context.scene
-    # ensure there are no duplicates in the list
-    chromosome_1d = list(dict.fromkeys(sum(chromosome, [])))
 
-    bpy.context.scene.frame_set(frame=0)
-    remove_physics_hinge(chromosome_1d)
-    calc_physics(scene.my_tool)
+    parser = argparse.ArgumentParser(prog="blender -b model.blend --python main.py --",
+                                     description="find the optimal demolition of the model with a genetic algorithm")
+    parser.add_argument("--generations", type=int, default=0,
+                        help="run this many generations without user interface and exit, 0 registers the panel")
+    parser.add_argument("--pool", type=int, default=chromosome_pool_size,
+                        help="number of chromosomes per generation, must be a multiple of 4")
+    parser.add_argument("--workers", type=int, default=worker_pool_size,
+                        help="number of background blender processes that evaluate the chromosomes")
+    parser.add_argument("--steady-state", action="store_true", default=steady_state,
+                        help="breed a new chromosome whenever a worker is free, runs generations * pool evaluations")
+    parser.add_argument("--threshold", type=float, help="breaking threshold of the hinges")
+    parser.add_argument("--substeps", type=int, help="substeps per frame of the simulation")
+    parser.add_argument("--solver-iterations", type=int, help="solver iterations of the simulation")
+    parser.add_argument("--speed", type=float, help="speed of the simulation")
+    parser.add_argument("--stepped-bake", action="store_true", default=None,
+                        help="simulate in chunks of frames and stop as soon as the structure has settled or still "
+                             "stands")
+    parser.add_argument("--candidate-max-height", type=float,
+                        help="only remove hinges up to this height, the hinges above it are never removed")
+    parser.add_argument("--compound", action="store_true", default=None,
+                        help="merge the members held together by hinges that are never removed into compound bodies")
+    parser.add_argument("--collision-shape", choices=["AUTO", "SPHERE", "BOX", "CAPSULE", "CYLINDER", "CONVEX_HULL"],
+                        help="collision shape of all members instead of the one in materials, AUTO picks the cheapest "
+                             "shape that fits every member")
+    parser.add_argument("--collision-filtering", action="store_true", default=None,
+                        help="skip the collisions between members that are joined by a hinge")
+    parser.add_argument("--deactivation", choices=["off", "settle", "far"],
+                        help="let members that come to rest sleep (settle), and also start the members far from the "
+                             "removed hinges asleep (far)")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the random number generator")
+    parser.add_argument("--output", help="json file the results are written to, defaults to <model>_genetic.json")
+    parser.add_argument("--multi-objective", action="store_true", default=multi_objective,
+                        help="optimise radius, height and removed clusters with NSGA-II and keep a pareto archive")
+    parser.add_argument("--prescreen", choices=["off", "downrank", "reject"], default=prescreen_mode,
+                        help="check chromosomes on the connectivity graph and skip the ones that cannot bring the "
+                             "structure down")
+    parser.add_argument("--surrogate", action="store_true", default=use_surrogate,
+                        help="score every chromosome with a cheap simulation first and only simulate the best ones "
+                             "with the full simulation parameters")
+    parser.add_argument("--surrogate-fraction", type=float, default=surrogate_fraction,
+                        help="fraction of the pool that is simulated with the full simulation parameters")
+    parser.add_argument("--surrogate-calibration-interval", type=int, default=surrogate_calibration_interval,
+                        help="simulate the whole pool with the full simulation parameters every this many generations "
+                             "to measure the surrogate correlation, 0 never measures it")
+    parser.add_argument("--fitness", choices=["frame", "trajectory"], default=fitness_mode,
+                        help="score the demolition at the evaluation frame or on its whole trajectory")
+    parser.add_argument("--backend", choices=["blender", "bullet"], default=physics_backend,
+                        help="physics engine that simulates the demolitions")
+    parser.add_argument("--calibrate", type=int, default=0, metavar="CHROMOSOMES",
+                        help="compare the scores of this many random chromosomes over a grid of substeps, solver "
+                             "iterations and speed with a high fidelity reference and exit")
+    parser.add_argument("--check-deactivation", type=int, default=0, metavar="CHROMOSOMES",
+                        help="compare the scores of this many random chromosomes with and without --deactivation and "
+                             "exit")
+    parser.add_argument("--export-scene",
+                        help="write the scene description for bullet_backend.py to this file and exit")
+    parser.add_argument("--fitness-cache", default=fitness_cache_path,
+                        help="sqlite file the fitness scores are stored in, so a later run does not simulate the same "
+                             "chromosomes again")
+    parser.add_argument("--bake-cache", default=bake_cache_dir,
+                        help="directory the baked demolitions are stored in, so they can be replayed without "
+                             "simulating them again")
+    parser.add_argument("--timing-log", help="append the time of every stage per chromosome and per generation to this "
+                                             "file, as csv if it ends with .csv and as json lines otherwise")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], help="profile evaluate_chromosome()")
+    parser.add_argument("--profile-output", default=profile_path, help="file the profile is written to")
+    parser.add_argument("--checkpoint", help="file the state of the genetic algorithm is saved to, defaults to "
+                                             "<model>_checkpoint.npz")
+    parser.add_argument("--checkpoint-interval", type=int, default=1,
+                        help="save a checkpoint every this many generations, 0 disables the checkpoints")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the checkpoint if there is one, --generations is the total to reach")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+
+    args = parser.parse_args(args)
+    if args.pool % 4 != 0:
+        parser.error("--pool must be a multiple of 4")
+    if not 0 < args.surrogate_fraction <= 1:
+        parser.error("--surrogate-fraction must be between 0 and 1")
+    if args.steady_state and args.workers == 0:
+        parser.error("--steady-state needs --workers")
+    if args.steady_state and args.multi_objective:
+        parser.error("--steady-state cannot be combined with --multi-objective")
+    if args.backend == "bullet" and (args.compound or args.deactivation not in (None, "off") or
+                                     args.check_deactivation > 0):
+        parser.error("--backend bullet simulates every member separately and never lets them sleep, so it cannot be "
+                     "combined with --compound or --deactivation")
+    return args
+
+
+def apply_script_params(mytool, args):
+    """
+    sets the simulation parameters that are given on the command line
 
-    bpy.context.scene.frame_set(frame=98)
-    score = evaluate_demolition(len(chromosome))
+    :param mytool: the scene properties (scene.my_tool)
+    :param args: the parsed arguments, see parse_script_args()
+    """
 
-    bpy.context.scene.frame_set(frame=0)
-    # add_physics_hinge(chromosome_1d, scene.my_tool)
-    add_physics_all_object(scene.my_tool.dem_threshold_float)
+    params = get_sim_params(mytool)
+    for key, value in [("threshold", args.threshold), ("substeps", args.substeps),
+                       ("solver_iterations", args.solver_iterations), ("speed", args.speed),
+                       ("candidate_max_height", args.candidate_max_height), ("compound_bodies", args.compound),
+                       ("collision_shape", args.collision_shape), ("collision_filtering", args.collision_filtering),
+                       ("deactivation", args.deactivation), ("stepped_bake", args.stepped_bake)]:
+        if value is not None:
+            params[key] = value
+    set_sim_params(mytool, params)
 
-    return score
+    if len(get_candidate_hinges()) == 0:
+        raise RuntimeError(f"no hinge is at or below --candidate-max-height {candidate_max_height}, so the genetic "
+                           f"algorithm has nothing to remove")
 
 
-def run_generation(context):
+def run_calibration(context, args):
     """
-    Runs the simulations of a single generation of chromosomes and evaluates
-    those.
+    runs calibrate_fidelity(), or check_deactivation() with --check-deactivation, without user interface and writes
+    the results to a json file
+
+    :param args: the parsed arguments, see parse_script_args()
     """
-    global generation
-    print("run generation " + str(generation))
-    if generation == 0:
-        init_chromosomes()
-    else:
-        mutate_chromosomes()
 
-    global chromosome_fitness
+    global worker_pool_size, physics_backend
+    worker_pool_size = args.workers
+    physics_backend = args.backend
+    mytool = context.scene.my_tool
+    apply_script_params(mytool, args)
 
-    for idx in range(0, chromosome_pool_size):
-        chromosome_fitness[idx] = evaluate_chromosome(chromosomes_idxs[idx], context)
+    bpy.context.scene.frame_set(frame=0)
+    if worker_pool_size == 0 and physics_backend == "blender":
+        add_physics_all_object(mytool.dem_threshold_float)
+    elif compound_bodies and compound_bodies_supported():
+        find_compound_groups()
 
-    generation += 1
+    if args.check_deactivation > 0:
+        results = check_deactivation(context, args.check_deactivation)
+    else:
+        results = calibrate_fidelity(context, args.calibrate)
+    stop_worker_pool()
 
-    # print results
-    avg_score = 0
-    min_score = 1
-    max_score = 0
-    print("chromosome scores:")
-    for fitness in chromosome_fitness:
-        min_score = min(min_score, fitness)
-        max_score = max(max_score, fitness)
-        avg_score += fitness
-        print(fitness)
+    suffix = "_deactivation.json" if args.check_deactivation > 0 else "_calibration.json"
+    output = args.output or os.path.splitext(bpy.data.filepath)[0] + suffix
+    with open(bpy.path.abspath(output), "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"results written to {output}")
 
-    avg_score = avg_score / len(chromosome_fitness)
 
-    print("avg: " + str(avg_score))
-    print("min: " + str(min_score))
-    print("max: " + str(max_score))
+def run_headless(context, args):
+    """
+    runs the genetic algorithm for args.generations generations without user interface and writes the results to
+    a json file.
+
+    :param args: the parsed arguments, see parse_script_args()
+    """
+
+    global chromosome_pool_size, chromosomes_idxs, chromosome_fitness, worker_pool_size, physics_backend, fitness_mode
+    global multi_objective, checkpoint_path, checkpoint_interval, prescreen_mode
+    global use_surrogate, surrogate_fraction, surrogate_calibration_interval
+    chromosome_pool_size = args.pool
+    chromosomes_idxs = [empty_chromosome() for idx in range(0, chromosome_pool_size)]
+    chromosome_fitness = [0] * chromosome_pool_size
+    worker_pool_size = args.workers
+    physics_backend = args.backend
+    fitness_mode = args.fitness
+    multi_objective = args.multi_objective
+    prescreen_mode = args.prescreen
+    use_surrogate = args.surrogate
+    surrogate_fraction = args.surrogate_fraction
+    surrogate_calibration_interval = args.surrogate_calibration_interval
+    checkpoint_path = args.checkpoint
+    checkpoint_interval = args.checkpoint_interval
+
+    mytool = context.scene.my_tool
+    apply_script_params(mytool, args)
+    # the pool of a checkpoint was scored with the simulation parameters of the checkpoint, so those are kept
+    if args.resume:
+        load_checkpoint(context)
+
+    # the workers add the physics themselves, only the candidates they merge into compound bodies are needed here
+    bpy.context.scene.frame_set(frame=0)
+    if worker_pool_size == 0 and physics_backend == "blender":
+        add_physics_all_object(mytool.dem_threshold_float)
+    elif compound_bodies and compound_bodies_supported():
+        find_compound_groups()
 
-    return {"avg": avg_score, "min": min_score, "max": max_score}
+    start_time = time.time()
+    if args.steady_state:
+        if evaluation_count < args.generations * chromosome_pool_size:
+            run_steady_state(context, args.generations * chromosome_pool_size - evaluation_count)
+    else:
+        while generation < args.generations:
+            run_generation(context)
+    stop_worker_pool()
+
+    best_idx = max(range(0, len(chromosome_fitness)), key=lambda idx: chromosome_fitness[idx])
+    output = args.output or os.path.splitext(bpy.data.filepath)[0] + "_genetic.json"
+    with open(bpy.path.abspath(output), "w") as file:
+        json.dump({"params": get_sim_params(mytool),
+                   "generations": generation_history,
+                   "surrogate_correlations": surrogate_correlations,
+                   "pareto_archive": [{"chromosome": chromosome_to_lists(entry["chromosome"]),
+                                       "objectives": entry["objectives"]} for entry in pareto_archive],
+                   "duration": time.time() - start_time,
+                   "chromosomes": [chromosome_to_lists(chromosome) for chromosome in chromosomes_idxs],
+                   "fitness": chromosome_fitness,
+                   "best": {"fitness": chromosome_fitness[best_idx],
+                            "chromosome": chromosome_to_lists(chromosomes_idxs[best_idx]),
+                            "hinges": [hinge_set[idx] for idx in chromosome_hinges(chromosomes_idxs[best_idx])]}},
+                  file, indent=2)
+    print(f"results written to {output}")
 
 
 # define the sliders of the UI window
@@ -574,6 +3451,7 @@ class DEMOLITION_PT_main_panel(bpy.types.Panel):
         layout.label(text="find optimal demolition")
         layout.operator("demolition.op_genetic")
         layout.operator("demolition.op_genetic_round")
+        layout.operator("demolition.op_resume")
         layout.label(text="control animation")
         layout.operator("demolition.op_start")
         layout.operator("demolition.op_stop")
@@ -602,17 +3480,30 @@ class DEMOLITION_OT_start(bpy.types.Operator):
             # otherwise there is no good score
             assert (index != -1)
 
-            displayed_demolition = sum(chromosomes_idxs[index].copy(), [])
-            print(f"chr: {chromosomes_idxs[index]}")
+            displayed_demolition = chromosome_hinges(chromosomes_idxs[index])
+            print(f"chr: {chromosome_to_lists(chromosomes_idxs[index])}")
             print(f"disp: {displayed_demolition}")
 
-            bpy.context.scene.frame_set(frame=0)
-            remove_physics_hinge(displayed_demolition)
-
-            calc_physics(mytool)
-
-            bpy.context.scene.frame_set(frame=0)
-            add_physics_hinge(displayed_demolition, scene.my_tool)
+            # the demolition is shown up to the frame it was scored at, so the bake of the genetic algorithm is
+            # played instead of simulated again
+            bake_key = bake_cache_key(displayed_demolition, get_sim_params(mytool)) if bake_cache_dir else None
+            bake = load_cached_bake(bake_key, get_bake_horizon()) if bake_key else None
+            if bake is not None:
+                print("playing the cached bake")
+                bpy.context.scene.frame_set(frame=0)
+                bpy.context.scene.frame_start = 1
+                bpy.context.scene.frame_end = evaluation_frame
+                start_cached_playback(bake)
+            else:
+                bpy.context.scene.frame_set(frame=0)
+                remove_physics_hinge(displayed_demolition)
+
+                calc_physics(mytool, evaluation_frame)
+                if bake_key:
+                    store_cached_bake(bake_key, record_bake(evaluation_frame))
+
+                bpy.context.scene.frame_set(frame=0)
+                add_physics_hinge(displayed_demolition, scene.my_tool)
 
         print(f"disp ready: {displayed_demolition}")
         bpy.ops.screen.animation_play()
@@ -633,8 +3524,22 @@ class DEMOLITION_OT_stop(bpy.types.Operator):
         bpy.ops.object.select_all(action='DESELECT')
         global displayed_demolition, hinge_set
         print(f"displayed_demolition: {displayed_demolition}")
-        bpy.context.scene.frame_set(frame=99)
-        score = evaluate_demolition(7)
+        # score the whole displayed demolition, the frames are read from the bake and not simulated again. Reading
+        # them moves the scene, so it is put back at the frame it stopped at
+        if cached_playback is not None:
+            bake = cached_playback
+        elif scene.rigidbody_world is not None and scene.rigidbody_world.point_cache.is_baked:
+            frame = scene.frame_current
+            bake = record_bake(evaluation_frame)
+            scene.frame_set(frame=frame)
+        else:
+            bake = None
+
+        if bake is not None:
+            score = evaluate_bake(bake, 7)
+            print(f"score: {score}")
+        else:
+            print("nothing is baked, press 'Run best model' first")
         for idx in displayed_demolition:
             print(hinge_set[idx])
             objectToSelect = bpy.data.objects[hinge_set[idx]]
@@ -659,6 +3564,7 @@ class DEMOLITION_OT_genetic_round(bpy.types.Operator):
         if len(displayed_demolition) != 0:
             bpy.ops.screen.animation_cancel()
             bpy.ops.object.select_all(action='DESELECT')
+            stop_cached_playback()
             add_physics_hinge(displayed_demolition, mytool)
             displayed_demolition = []
 
@@ -684,21 +3590,53 @@ class DEMOLITION_OT_genetic(bpy.types.Operator):
         if len(displayed_demolition) != 0:
             bpy.ops.screen.animation_cancel()
             bpy.ops.object.select_all(action='DESELECT')
+            stop_cached_playback()
             add_physics_hinge(displayed_demolition, mytool)
             displayed_demolition = []
 
         add_physics_all_object(mytool.dem_threshold_float)
         results = []
-        for x in range(0, 10):
-            results.append(run_generation(context))
+        if steady_state and worker_pool_size > 0 and not multi_objective:
+            results.append(run_steady_state(context, 10 * chromosome_pool_size))
+        else:
+            for x in range(0, 10):
+                results.append(run_generation(context))
         print(results)
 
         return {'FINISHED'}
 
 
+# resume button
+class DEMOLITION_OT_resume(bpy.types.Operator):
+    bl_label = "Resume from checkpoint"
+    bl_idname = "demolition.op_resume"
+
+    def execute(self, context):
+        global displayed_demolition
+
+        bpy.context.scene.frame_set(frame=0)
+        if len(displayed_demolition) != 0:
+            bpy.ops.screen.animation_cancel()
+            bpy.ops.object.select_all(action='DESELECT')
+            stop_cached_playback()
+            add_physics_hinge(displayed_demolition, context.scene.my_tool)
+            displayed_demolition = []
+
+        try:
+            loaded = load_checkpoint(context)
+        except RuntimeError as error:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
+        if not loaded:
+            self.report({'WARNING'}, "no checkpoint found, write one with the headless runner first")
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+
 # required blender specific functions
 classes = [MyProperties, DEMOLITION_PT_main_panel, DEMOLITION_OT_start, DEMOLITION_OT_stop,
-           DEMOLITION_OT_genetic, DEMOLITION_OT_genetic_round]
+           DEMOLITION_OT_genetic, DEMOLITION_OT_genetic_round, DEMOLITION_OT_resume]
 
 
 def register():
@@ -707,6 +3645,15 @@ def register():
         bpy.types.Scene.my_tool = bpy.props.PointerProperty(type=MyProperties)
 
 
+def register_properties():
+    """
+    only registers the properties, for runs without user interface
+    """
+
+    bpy.utils.register_class(MyProperties)
+    bpy.types.Scene.my_tool = bpy.props.PointerProperty(type=MyProperties)
+
+
 def unregister():
     for cls in classes:
         bpy.utils.unregister_class(cls)
@@ -714,7 +3661,27 @@ def unregister():
 
 
 if __name__ == "__main__":
-    seed(1)
+    script_args = parse_script_args(get_script_args())
+    seed(script_args.seed)
+    timing_log_path = script_args.timing_log
+    profiler = script_args.profile
+    profile_path = script_args.profile_output
+    fitness_cache_path = script_args.fitness_cache
+    bake_cache_dir = script_args.bake_cache
     init_hinge_set()
     add_material_properties("ground.000", materials["ground"])
-    register()
+
+    if script_args.export_scene:
+        bpy.context.scene.frame_set(frame=0)
+        export_scene_description(script_args.export_scene)
+    elif script_args.worker:
+        register_properties()
+        run_worker(bpy.context)
+    elif script_args.calibrate > 0 or script_args.check_deactivation > 0:
+        register_properties()
+        run_calibration(bpy.context, script_args)
+    elif script_args.generations > 0:
+        register_properties()
+        run_headless(bpy.context, script_args)
+    else:
+        register()
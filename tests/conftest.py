@@ -0,0 +1,38 @@
+import os
+import sys
+import types
+from unittest import mock
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main.py needs blender's python modules. Outside of blender they are replaced by stubs, which is enough for the
+# functions that only work on numpy arrays
+try:
+    import bpy
+except ImportError:
+    class Stub:
+        pass
+
+    bpy = mock.MagicMock()
+    bpy.types.Operator = bpy.types.Panel = bpy.types.PropertyGroup = Stub
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Matrix = mathutils.Vector = Stub
+    kdtree = types.ModuleType("mathutils.kdtree")
+    kdtree.KDTree = Stub
+    mathutils.kdtree = kdtree
+    sys.modules.update({"bpy": bpy, "mathutils": mathutils, "mathutils.kdtree": kdtree})
+
+
+@pytest.fixture
+def hinges(monkeypatch):
+    """
+    a model with 21 hinges, which is not a multiple of 8, so the last byte of a bitset is only partly used
+    """
+
+    import main
+    monkeypatch.setattr(main, "hinge_set", [f"hinge.{idx:03}" for idx in range(0, 21)])
+    monkeypatch.setattr(main, "hinge_positions", np.array([[0, 0, idx] for idx in range(0, 21)], dtype=np.float64))
+    monkeypatch.setattr(main, "model_hash", "model")
+    return main.hinge_set
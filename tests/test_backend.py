@@ -0,0 +1,11 @@
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("args", [["--compound"], ["--deactivation", "settle"], ["--check-deactivation", "8"]])
+def test_bullet_backend_rejects_blender_only_options(args, capsys):
+    with pytest.raises(SystemExit):
+        main.parse_script_args(["--backend", "bullet"] + args)
+    assert "--backend bullet" in capsys.readouterr().err
+    assert main.parse_script_args(["--backend", "bullet", "--deactivation", "off"]).backend == "bullet"
@@ -0,0 +1,43 @@
+import os
+import numpy as np
+
+import main
+
+
+def test_bake_cache_key(hinges, monkeypatch):
+    params = {"threshold": 4000, "substeps": 30}
+    key = main.bake_cache_key([5, 1, 2], params)
+    assert main.bake_cache_key([1, 2, 5, 2], params) == key
+    assert main.bake_cache_key([1, 2], params) != key
+    assert main.bake_cache_key([1, 2, 5], dict(params, substeps=10)) != key
+
+    monkeypatch.setattr(main, "model_hash", "another model")
+    assert main.bake_cache_key([1, 2, 5], params) != key
+
+
+def test_store_cached_bake_evicts_the_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(main.bpy.path, "abspath", lambda path: path)
+    monkeypatch.setattr(main, "bake_cache_dir", str(tmp_path))
+    bakes = {key: np.full((3, 2, 4, 4), idx, dtype=np.float32) for idx, key in enumerate(["a", "b", "c"])}
+
+    main.store_cached_bake("a", bakes["a"])
+    main.store_cached_bake("b", bakes["b"])
+    bake_size = os.path.getsize(tmp_path / "a.npy")
+    monkeypatch.setattr(main, "bake_cache_size", 2 * bake_size)
+    os.utime(tmp_path / "a.npy", (1000, 1000))
+    os.utime(tmp_path / "b.npy", (2000, 2000))
+
+    # loading a bake makes it the most recently used one, so b is evicted instead of a
+    assert np.array_equal(main.load_cached_bake("a", 3), bakes["a"])
+    main.store_cached_bake("c", bakes["c"])
+    assert sorted(os.listdir(tmp_path)) == ["a.npy", "c.npy"]
+    assert main.load_cached_bake("b", 3) is None
+    # a bake that is shorter than the frames that are needed is no hit
+    assert main.load_cached_bake("c", 4) is None
+
+    # a single bake that is larger than the cache is kept
+    os.utime(tmp_path / "a.npy", (1000, 1000))
+    os.utime(tmp_path / "c.npy", (1000, 1000))
+    monkeypatch.setattr(main, "bake_cache_size", 0)
+    main.store_cached_bake("d", bakes["a"])
+    assert os.listdir(tmp_path) == ["d.npy"]
@@ -0,0 +1,61 @@
+import types
+import numpy as np
+import pytest
+
+import main
+
+
+@pytest.fixture
+def low_candidates(hinges, monkeypatch):
+    """
+    only the four lowest hinges are candidates, and a cluster is a hinge and the one above it
+    """
+
+    monkeypatch.setattr(main, "candidate_max_height", 3)
+    monkeypatch.setattr(main, "merged_candidates", [])
+    monkeypatch.setattr(main, "get_closest_hinges", lambda idx: [idx, idx + 1])
+    return main.get_candidate_hinges()
+
+
+def test_candidate_hinges(low_candidates, monkeypatch):
+    assert low_candidates.tolist() == [0, 1, 2, 3]
+    assert main.get_hinge_cluster(3).tolist() == main.hinge_mask([3]).tolist()
+
+    monkeypatch.setattr(main, "merged_candidates", [1])
+    assert main.get_candidate_hinges().tolist() == [0, 2, 3]
+
+
+def test_random_chromosome_stays_below_the_limit(low_candidates):
+    for idx in range(0, 20):
+        assert set(main.chromosome_hinges(main.random_chromosome())) <= {0, 1, 2, 3}
+
+
+def test_random_mutations_with_every_candidate_removed(low_candidates, monkeypatch):
+    monkeypatch.setattr(main, "mutation_rate", 1)
+    chromosome = main.chromosome_from_lists([[0, 1], [2, 3]])
+    assert np.array_equal(main.random_mutations(chromosome), chromosome)
+
+
+def test_random_chromosome_without_candidates(hinges, monkeypatch):
+    monkeypatch.setattr(main, "candidate_max_height", -1)
+    monkeypatch.setattr(main, "merged_candidates", [])
+    assert main.random_chromosome().shape == (0, 3)
+
+
+def test_find_compound_groups(hinges, monkeypatch):
+    members = [types.SimpleNamespace(name=name, parent=None) for name in ["a", "b", "c", "d"]]
+    pairs = {name: (None, None) for name in hinges}
+    # hinge 0 and 1 are candidates, hinge 2 and 3 hold a, c and d together, so the candidate hinge 1 is inside
+    pairs.update({hinges[0]: ("a", "b"), hinges[1]: ("a", "d"), hinges[2]: ("a", "c"), hinges[3]: ("c", "d")})
+    monkeypatch.setattr(main, "candidate_max_height", 1)
+    monkeypatch.setattr(main, "merged_candidates", [])
+    monkeypatch.setattr(main, "hinge_pairs", pairs)
+    monkeypatch.setattr(main, "get_member_objects", lambda: members)
+
+    found_members, found_pairs, valid, labels, internal = main.find_compound_groups()
+    assert found_members == members
+    assert valid.tolist() == [True] * 4 + [False] * 17
+    assert labels[0] == labels[2] == labels[3] != labels[1]
+    assert np.flatnonzero(internal).tolist() == [1, 2, 3]
+    assert main.merged_candidates == [1]
+    assert main.get_candidate_hinges().tolist() == [0]
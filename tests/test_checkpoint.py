@@ -0,0 +1,52 @@
+import types
+import numpy as np
+
+import main
+
+
+def random_chromosome(rng, clusters):
+    return main.chromosome_from_lists([sorted(rng.choice(21, size=rng.integers(1, 5), replace=False).tolist())
+                                       for idx in range(0, clusters)])
+
+
+def test_pack_chromosomes(hinges):
+    rng = np.random.default_rng(3)
+    chromosomes = [random_chromosome(rng, clusters) for clusters in [2, 0, 5, 1, 0]]
+    rows, counts = main.pack_chromosomes(chromosomes)
+    unpacked = main.unpack_chromosomes(rows, counts)
+    assert len(unpacked) == len(chromosomes)
+    for chromosome, unpacked_chromosome in zip(chromosomes, unpacked):
+        assert np.array_equal(chromosome, unpacked_chromosome)
+
+    rows, counts = main.pack_chromosomes([])
+    assert main.unpack_chromosomes(rows, counts) == []
+
+
+def test_checkpoint_round_trip(hinges, tmp_path, monkeypatch):
+    mytool = types.SimpleNamespace(dem_threshold_float=4000, dem_substeps_float=30, dem_solver_iter_float=20,
+                                   dem_speed_float=3)
+    context = types.SimpleNamespace(scene=types.SimpleNamespace(my_tool=mytool))
+    rng = np.random.default_rng(5)
+    # a pool that is only partly evaluated still has empty chromosomes
+    chromosomes = [random_chromosome(rng, clusters) for clusters in [3, 0, 1, 0]]
+    fitness = [0.5, 0, 0.25, 0]
+    monkeypatch.setattr(main.bpy.path, "abspath", lambda path: path)
+    monkeypatch.setattr(main, "checkpoint_path", str(tmp_path / "checkpoint.npz"))
+    for name, value in [("chromosomes_idxs", chromosomes), ("chromosome_fitness", fitness),
+                        ("chromosome_objectives", []), ("pareto_archive", []), ("generation", 3),
+                        ("evaluation_count", 12), ("generation_history", [{"best": 0.5}]),
+                        ("surrogate_correlations", [])]:
+        monkeypatch.setattr(main, name, value)
+
+    main.save_checkpoint(context)
+    monkeypatch.setattr(main, "chromosomes_idxs", [])
+    monkeypatch.setattr(main, "chromosome_fitness", [])
+    monkeypatch.setattr(main, "generation", 0)
+    assert main.load_checkpoint(context)
+
+    assert len(main.chromosomes_idxs) == len(chromosomes)
+    for chromosome, loaded_chromosome in zip(chromosomes, main.chromosomes_idxs):
+        assert np.array_equal(chromosome, loaded_chromosome)
+    assert main.chromosome_fitness == fitness
+    assert main.generation == 3
+    assert main.generation_history == [{"best": 0.5}]
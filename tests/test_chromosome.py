@@ -0,0 +1,23 @@
+import numpy as np
+
+import main
+
+
+def test_hinge_mask(hinges):
+    rng = np.random.default_rng(2)
+    for size in [0, 1, 7, 8, 21]:
+        hinge_idxs = sorted(rng.choice(len(hinges), size=size, replace=False).tolist())
+        mask = main.hinge_mask(hinge_idxs)
+        assert mask.shape == ((len(hinges) + 7) // 8,)
+        assert np.array_equal(mask, np.packbits(np.isin(np.arange(len(hinges)), hinge_idxs)))
+        assert main.mask_hinges(mask) == hinge_idxs
+
+
+def test_chromosome_lists(hinges):
+    clusters = [[0, 3, 20], [3, 8], [15]]
+    chromosome = main.chromosome_from_lists(clusters)
+    assert chromosome.shape == (3, 3)
+    assert main.chromosome_to_lists(chromosome) == clusters
+    assert main.chromosome_hinges(chromosome) == [0, 3, 8, 15, 20]
+    assert main.chromosome_from_lists([]).shape == main.empty_chromosome().shape == (0, 3)
+    assert main.chromosome_hinges(main.empty_chromosome()) == []
@@ -0,0 +1,62 @@
+import itertools
+import types
+import numpy as np
+import pytest
+
+import main
+
+
+def box_object(name, low, high, scale=(1, 1, 1)):
+    """
+    an object whose mesh has the bounding box from low to high in local coordinates
+    """
+
+    corners = [tuple(corner) for corner in itertools.product(*zip(low, high))]
+    dimensions = (np.array(high) - np.array(low)) * np.array(scale)
+    return types.SimpleNamespace(name=name, bound_box=corners, scale=scale, dimensions=tuple(dimensions))
+
+
+@pytest.fixture
+def mesh_volumes(monkeypatch):
+    volumes = {}
+    monkeypatch.setattr(main, "shape_fit_tolerance", 0.15)
+    monkeypatch.setattr(main, "fitted_shapes", {})
+    monkeypatch.setattr(main, "calc_mesh_volume", lambda obj: volumes[obj.name])
+    return volumes
+
+
+@pytest.mark.parametrize("name,low,high,scale,volume,shape", [
+    ("cube", (-1, -1, -1), (1, 1, 1), (1, 1, 1), 8, "BOX"),
+    ("ball", (-1, -1, -1), (1, 1, 1), (1, 1, 1), 4 / 3 * np.pi, "SPHERE"),
+    ("column", (-0.1, -0.1, -1), (0.1, 0.1, 1), (1, 1, 2), np.pi * 0.01 * 4, "CAPSULE"),
+    ("disk", (-1, -1, -0.25), (1, 1, 0.25), (1, 1, 1), np.pi * 0.5, "CYLINDER"),
+    # the proportions of a capsule or cylinder need a round cross section
+    ("beam", (-1, -0.5, -2), (1, 0.5, 2), (1, 1, 1), 6, "CONVEX_HULL"),
+    # a primitive would be centred on the origin at the end of the column
+    ("hanging column", (-0.1, -0.1, 0), (0.1, 0.1, 4), (1, 1, 1), np.pi * 0.01 * 4, "CONVEX_HULL"),
+])
+def test_fit_collision_shape(mesh_volumes, name, low, high, scale, volume, shape):
+    mesh_volumes[name] = volume
+    assert main.fit_collision_shape(box_object(name, low, high, scale)) == shape
+
+
+def test_fit_collision_shape_is_cached(mesh_volumes):
+    mesh_volumes["cube"] = 8
+    assert main.fit_collision_shape(box_object("cube", (-1, -1, -1), (1, 1, 1))) == "BOX"
+    mesh_volumes["cube"] = 1
+    assert main.fit_collision_shape(box_object("cube", (-1, -1, -1), (1, 1, 1))) == "BOX"
+
+
+def test_calc_mesh_volume():
+    class Collection(list):
+        def foreach_get(self, attribute, values):
+            values[:] = np.ravel(self)
+
+    corners = list(itertools.product([-1, 1], repeat=3))
+    # two triangles per side of the cube, wound outwards
+    faces = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    triangles = Collection([face[:3] for face in faces] + [[face[0], face[2], face[3]] for face in faces])
+    mesh = types.SimpleNamespace(vertices=Collection(corners), loop_triangles=triangles,
+                                 calc_loop_triangles=lambda: None)
+    obj = types.SimpleNamespace(data=mesh, scale=(1, 2, 0.5))
+    assert main.calc_mesh_volume(obj) == pytest.approx(8)
@@ -0,0 +1,27 @@
+import itertools
+import numpy as np
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("node_count,edge_count", [(1, 0), (10, 0), (30, 20), (100, 60), (100, 300)])
+def test_connected_components(node_count, edge_count):
+    rng = np.random.default_rng(node_count + edge_count)
+    edge_a = rng.integers(0, node_count, size=edge_count)
+    edge_b = rng.integers(0, node_count, size=edge_count)
+
+    # union find as reference
+    parent = list(range(0, node_count))
+
+    def find(node):
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    for a, b in zip(edge_a, edge_b):
+        parent[find(a)] = find(b)
+
+    labels = main.connected_components(node_count, edge_a, edge_b)
+    for a, b in itertools.combinations(range(0, node_count), 2):
+        assert (labels[a] == labels[b]) == (find(a) == find(b))
@@ -0,0 +1,79 @@
+import types
+import numpy as np
+import pytest
+
+import main
+
+
+class Objects(list):
+    """
+    the scene objects, which can be looked up by index and by name
+    """
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return next(obj for obj in self if obj.name == key)
+        return list.__getitem__(self, key)
+
+    def __contains__(self, name):
+        return any(obj.name == name for obj in self)
+
+
+def body(name, z, parent=None, start_deactivated=False):
+    rigid_body = types.SimpleNamespace(type="ACTIVE", use_start_deactivated=start_deactivated)
+    return types.SimpleNamespace(name=name, parent=parent, rigid_body=rigid_body,
+                                 matrix_world=types.SimpleNamespace(translation=(0, 0, z)))
+
+
+@pytest.fixture
+def scene(hinges, monkeypatch):
+    compound = body("compound", 30)
+    objects = Objects([body("member.000", 0), body("member.001", 5, start_deactivated=True), body("member.002", 20),
+                       body("member.003", 30, parent=compound), compound])
+    members = np.arange(0, 4)
+    monkeypatch.setattr(main, "bpy", types.SimpleNamespace(context=types.SimpleNamespace(
+        scene=types.SimpleNamespace(objects=objects))))
+    monkeypatch.setattr(main, "get_member_idxs", lambda: members)
+    monkeypatch.setattr(main, "get_member_locations",
+                        lambda: np.array([obj.matrix_world.translation for obj in objects[:4]], dtype=np.float64))
+    monkeypatch.setattr(main, "compound_objects", ["compound"])
+    monkeypatch.setattr(main, "deactivation_distance", 10)
+    # the hinges of the fixture are at a height of their index
+    monkeypatch.setattr(main, "removed_hinges", {0, 1})
+    return objects
+
+
+def start_deactivated(objects):
+    return [obj.rigid_body.use_start_deactivated for obj in objects]
+
+
+def test_update_start_deactivated(scene, monkeypatch):
+    monkeypatch.setattr(main, "deactivation_mode", "far")
+    main.update_start_deactivated()
+    # the member inside the compound object is simulated as part of it and keeps its setting
+    assert start_deactivated(scene) == [False, False, True, False, True]
+
+    monkeypatch.setattr(main, "removed_hinges", set())
+    main.update_start_deactivated()
+    assert start_deactivated(scene) == [False] * 5
+
+
+def test_update_start_deactivated_only_far(scene, monkeypatch):
+    monkeypatch.setattr(main, "deactivation_mode", "settle")
+    main.update_start_deactivated()
+    assert start_deactivated(scene) == [False, True, False, False, False]
+
+
+def test_compare_scores(monkeypatch):
+    monkeypatch.setattr(main, "calibration_min_correlation", 0.9)
+    monkeypatch.setattr(main, "calibration_max_error", 0.05)
+    reference = [0.1, 0.5, 0.3, 0.9]
+
+    comparison = main.compare_scores(reference, [0.12, 0.52, 0.31, 0.88])
+    assert comparison["correlation"] == pytest.approx(1)
+    assert comparison["error"] == pytest.approx(0.0175)
+    assert comparison["matches"]
+    assert not main.compare_scores(reference, [0.2, 0.6, 0.4, 1.0])["matches"]
+    assert not main.compare_scores(reference, [0.5, 0.1, 0.3, 0.9])["matches"]
+    # equal scores have no ranking, so they do not match either
+    assert not main.compare_scores([0.5] * 4, [0.5] * 4)["matches"]
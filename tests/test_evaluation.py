@@ -0,0 +1,46 @@
+from math import sqrt
+import numpy as np
+import pytest
+
+import main
+
+
+def baseline_evaluation(locations, removed_clusters, w_r=3, w_h=5, w_d=1, hard_max_removed_clusters=36,
+                        hard_max_radius=50, hard_max_height=50):
+    """
+    the evaluation of a single frame as evaluate_demolition() computed it before it was vectorised
+    """
+
+    max_radius = 0
+    max_height = 0
+    for loc in locations:
+        max_height = max(loc[2], max_height)
+        max_radius = max(sqrt(loc[0] ** 2 + loc[1] ** 2), max_radius)
+
+    r_norm = min(max_radius / hard_max_radius, 1)
+    h_norm = min(max_height / hard_max_height, 1)
+    d_norm = min(removed_clusters / hard_max_removed_clusters, 1)
+    return (w_r * (1 - r_norm) + w_h * (1 - h_norm) ** 3 + w_d * (1 - d_norm)) / (w_r + w_h + w_d)
+
+
+@pytest.mark.parametrize("removed_clusters", [0, 5, 40])
+def test_score_demolition(removed_clusters):
+    rng = np.random.default_rng(removed_clusters)
+    # a few frames of members that are partly below the ground and partly beyond the hard maxima
+    frames = rng.normal(0, 30, size=(4, 25, 3))
+
+    max_radius, max_height = main.demolition_metrics(frames)
+    assert max_radius.shape == max_height.shape == (4,)
+    scores = main.score_demolition(max_radius, max_height, removed_clusters)
+    expected = [baseline_evaluation(locations, removed_clusters) for locations in frames]
+    assert np.allclose(scores, expected)
+
+    weights = {"w_r": 1, "w_h": 2, "w_d": 4, "hard_max_radius": 20}
+    max_radius, max_height = main.demolition_metrics(frames[0])
+    assert main.score_demolition(max_radius, max_height, removed_clusters, **weights) == \
+        pytest.approx(baseline_evaluation(frames[0], removed_clusters, **weights))
+
+
+def test_demolition_metrics_without_members():
+    max_radius, max_height = main.demolition_metrics(np.zeros((0, 3)))
+    assert max_radius == max_height == 0
@@ -0,0 +1,16 @@
+import main
+
+
+def test_chromosome_key(hinges, monkeypatch):
+    params = {"threshold": 4000, "substeps": 30}
+    chromosome = main.chromosome_from_lists([[1, 2], [5]])
+    key = main.chromosome_key(chromosome, params)
+
+    # the order of the clusters does not change which hinges are removed
+    assert main.chromosome_key(main.chromosome_from_lists([[5], [1, 2]]), params) == key
+    # the number of clusters is part of the score
+    assert main.chromosome_key(main.chromosome_from_lists([[1, 2, 5]]), params) != key
+    assert main.chromosome_key(chromosome, dict(params, substeps=10)) != key
+
+    monkeypatch.setattr(main, "model_hash", "another model")
+    assert main.chromosome_key(chromosome, params) != key
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import main
+
+
+def dominates(a, b):
+    return np.all(a <= b) and np.any(a < b)
+
+
+def naive_fronts(objectives):
+    """
+    peels off the non dominated solutions one front at the time
+    """
+
+    remaining = list(range(0, len(objectives)))
+    fronts = []
+    while remaining:
+        front = [i for i in remaining if not any(dominates(objectives[j], objectives[i]) for j in remaining)]
+        fronts.append(sorted(front))
+        remaining = [i for i in remaining if i not in front]
+    return fronts
+
+
+@pytest.mark.parametrize("solutions,objective_count", [(1, 2), (20, 2), (50, 3), (100, 4)])
+def test_non_dominated_sort(solutions, objective_count):
+    rng = np.random.default_rng(solutions)
+    # few distinct values, so there are ties and duplicates
+    objectives = rng.integers(0, 5, size=(solutions, objective_count)).astype(np.float64)
+    assert [sorted(front) for front in main.non_dominated_sort(objectives)] == naive_fronts(objectives)
+
+
+def test_crowding_distance():
+    rng = np.random.default_rng(1)
+    objectives = rng.random((10, 3))
+    expected = np.zeros(len(objectives))
+    for values in objectives.T:
+        order = np.argsort(values, kind="stable")
+        for position, idx in enumerate(order):
+            if position in (0, len(order) - 1):
+                expected[idx] = np.inf
+            elif np.isfinite(expected[idx]):
+                expected[idx] += (values[order[position + 1]] - values[order[position - 1]]) / np.ptp(values)
+    assert np.allclose(main.crowding_distance(objectives), expected)
+    assert np.isinf(main.crowding_distance(objectives[:2])).all()
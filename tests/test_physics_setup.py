@@ -0,0 +1,41 @@
+import types
+
+import main
+
+
+class Collection(list):
+    def __contains__(self, name):
+        return any(obj.name == name for obj in self)
+
+    def link(self, obj):
+        self.append(obj)
+
+
+def test_link_physics_objects_updates_once(monkeypatch):
+    world = types.SimpleNamespace(collection=types.SimpleNamespace(objects=Collection()),
+                                  constraints=types.SimpleNamespace(objects=Collection()),
+                                  point_cache=types.SimpleNamespace(frame_start=1))
+    objects = {name: types.SimpleNamespace(name=name, rigid_body=None, rigid_body_constraint=None)
+               for name in ["metal.000", "metal.001", "hinge.000"]}
+    frames = []
+
+    def frame_set(frame):
+        # like blender, the update creates the settings of the linked objects
+        frames.append(frame)
+        for obj in world.collection.objects:
+            obj.rigid_body = obj.rigid_body or object()
+        for obj in world.constraints.objects:
+            obj.rigid_body_constraint = obj.rigid_body_constraint or object()
+
+    scene = types.SimpleNamespace(objects=objects, frame_set=frame_set)
+    monkeypatch.setattr(main, "bpy", types.SimpleNamespace(context=types.SimpleNamespace(scene=scene)))
+    monkeypatch.setattr(main, "get_rigidbody_world", lambda: world)
+
+    main.link_physics_objects(["metal.000", "metal.001"], ["hinge.000"])
+    assert frames == [1]
+    assert objects["metal.001"].rigid_body is not None and objects["hinge.000"].rigid_body_constraint is not None
+
+    # re-arming the physics links nothing and needs no update
+    main.link_physics_objects(["metal.000", "metal.001"], ["hinge.000"])
+    assert frames == [1]
+    assert len(world.collection.objects) == 2 and len(world.constraints.objects) == 1
@@ -0,0 +1,11 @@
+import pytest
+
+import main
+
+
+@pytest.mark.parametrize("args", [["--steady-state"], ["--steady-state", "--workers", "4", "--multi-objective"]])
+def test_steady_state_needs_single_objective_workers(args, capsys):
+    with pytest.raises(SystemExit):
+        main.parse_script_args(args)
+    assert "--steady-state" in capsys.readouterr().err
+    assert main.parse_script_args(["--steady-state", "--workers", "4"]).steady_state
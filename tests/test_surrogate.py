@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+import main
+
+
+def test_rank_correlation():
+    rng = np.random.default_rng(4)
+    scores1 = rng.integers(0, 6, size=30).astype(np.float64)
+    scores2 = scores1 + rng.normal(0, 2, size=30)
+
+    def ranks(scores):
+        # average rank of the tied scores
+        return np.array([np.mean([rank for rank, other in enumerate(sorted(scores)) if other == score])
+                         for score in scores])
+
+    expected = np.corrcoef(ranks(scores1), ranks(scores2))[0, 1]
+    assert main.rank_correlation(scores1, scores2) == pytest.approx(expected)
+    assert main.rank_correlation([1, 2, 3], [30, 20, 10]) == pytest.approx(-1)
+    assert main.rank_correlation([1, 2, 3], [1, 4, 9]) == pytest.approx(1)
+    assert np.isnan(main.rank_correlation([1, 1, 1], [1, 2, 3]))
+    assert np.isnan(main.rank_correlation([1], [1]))
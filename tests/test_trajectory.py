@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import main
+
+
+def test_trajectory_metrics(monkeypatch):
+    monkeypatch.setattr(main, "fall_height_fraction", 0.2)
+    monkeypatch.setattr(main, "impact_height", 1.0)
+    # member 0 falls from the top and hits the ground between frame 3 and 4, member 1 stays low and slides away
+    trajectory = np.array([[[0, 0, 10], [3, 4, 1.5]],
+                           [[0, 0, 8], [3, 4, 1.5]],
+                           [[0, 0, 5], [3, 4, 1.5]],
+                           [[0, 0, 0.5], [3, 4, 1.5]],
+                           [[0, 0, 0.5], [6, 8, 1.5]]], dtype=np.float64)
+    masses = np.array([2.0, 1.0])
+
+    metrics = main.trajectory_metrics(trajectory, masses, frame_time=0.1)
+    assert metrics["peak_radius"] == pytest.approx(10)
+    assert metrics["final_height"] == pytest.approx(1.5)
+    # below 20% of the starting height from the fourth frame on
+    assert metrics["fall_frames"] == 4
+    # the slide of member 1 is faster, but it does not hit the ground
+    assert metrics["impact_momentum"] == pytest.approx(2 * 4.5 / 0.1)
+    assert metrics["reference_momentum"] == pytest.approx(2 * np.sqrt(2 * 9.81 * 10))
+
+
+def test_trajectory_metrics_of_a_standing_tower(monkeypatch):
+    monkeypatch.setattr(main, "fall_height_fraction", 0.2)
+    trajectory = np.repeat([[[0, 0, 10], [1, 0, 5]]], 6, axis=0).astype(np.float64)
+
+    metrics = main.trajectory_metrics(trajectory, np.ones(2), frame_time=0.1)
+    assert metrics["fall_frames"] == len(trajectory)
+    assert metrics["impact_momentum"] == 0
+    assert main.score_trajectory(metrics["peak_radius"], metrics["final_height"], 0, 1, 0) < \
+        main.score_trajectory(metrics["peak_radius"], 0, 0, 0.5, 0)